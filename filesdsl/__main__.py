@@ -77,7 +77,7 @@ def _prepare_command(argv: list[str]) -> int:
         folder_path = folder_path.resolve()
 
     try:
-        stats = prepare_semantic_database(folder_path)
+        stats = prepare_semantic_database(folder_path, workers=os.cpu_count() or 1)
     except DSLRuntimeError as exc:
         print(exc.format(), file=sys.stderr)
         return 1
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import operator
+import re
+
+from .ast_nodes import (
+    Assign,
+    Attribute,
+    BinaryOp,
+    BoolOp,
+    Call,
+    CompareOp,
+    Expression,
+    ExprStatement,
+    ForStatement,
+    IfStatement,
+    ListLiteral,
+    Literal,
+    Name,
+    Program,
+    RangeItem,
+    Statement,
+    UnaryOp,
+)
+
+
+# Constant list literals larger than this are still built at run time so a
+# script like `[1:10000000]` does not balloon the cached program.
+_MAX_CONSTANT_LIST = 4096
+
+_FOLDABLE_OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod,
+}
+
+
+def optimize(program: Program) -> Program:
+    """Fold constant expressions and drop no-op statements in place.
+
+    Arithmetic over literal operands is evaluated once, list literals made only
+    of literals and literal ranges are precomputed, and bare literal expression
+    statements are removed. Anything that would raise at run time is left as is
+    so errors still surface with their usual message and location.
+    """
+    program.statements = _fold_block(program.statements)
+    return program
+
+
+def _fold_block(statements: list[Statement]) -> list[Statement]:
+    folded: list[Statement] = []
+    for stmt in statements:
+        if isinstance(stmt, Assign):
+            stmt.expr = _fold_expr(stmt.expr)
+        elif isinstance(stmt, ExprStatement):
+            stmt.expr = _fold_expr(stmt.expr)
+            if isinstance(stmt.expr, Literal):
+                continue
+        elif isinstance(stmt, ForStatement):
+            stmt.iterable = _fold_expr(stmt.iterable)
+            stmt.body = _fold_block(stmt.body)
+        elif isinstance(stmt, IfStatement):
+            stmt.branches = [
+                (_fold_expr(condition), _fold_block(body)) for condition, body in stmt.branches
+            ]
+            if stmt.else_body is not None:
+                stmt.else_body = _fold_block(stmt.else_body)
+        folded.append(stmt)
+    return folded
+
+
+def _fold_expr(expr: Expression) -> Expression:
+    if isinstance(expr, ListLiteral):
+        expr.items = [_fold_expr(item) for item in expr.items]
+        expr.constant = _constant_list(expr.items)
+        return expr
+    if isinstance(expr, RangeItem):
+        expr.start = _fold_expr(expr.start)
+        expr.end = _fold_expr(expr.end)
+        return expr
+    if isinstance(expr, Attribute):
+        expr.obj = _fold_expr(expr.obj)
+        return expr
+    if isinstance(expr, Call):
+        expr.callee = _fold_expr(expr.callee)
+        expr.args = [_fold_expr(arg) for arg in expr.args]
+        expr.kwargs = [(name, _fold_expr(value)) for name, value in expr.kwargs]
+        return expr
+    if isinstance(expr, UnaryOp):
+        expr.operand = _fold_expr(expr.operand)
+        return _fold_unary(expr)
+    if isinstance(expr, BinaryOp):
+        expr.left = _fold_expr(expr.left)
+        expr.right = _fold_expr(expr.right)
+        return _fold_binary(expr)
+    if isinstance(expr, BoolOp):
+        expr.operands = [_fold_expr(operand) for operand in expr.operands]
+        if all(isinstance(operand, Literal) for operand in expr.operands):
+            truthy = [bool(operand.value) for operand in expr.operands]
+            return Literal(all(truthy) if expr.op == "and" else any(truthy), expr.loc)
+        return expr
+    if isinstance(expr, CompareOp):
+        expr.left = _fold_expr(expr.left)
+        expr.right = _fold_expr(expr.right)
+    return expr
+
+
+def _fold_unary(expr: UnaryOp) -> Expression:
+    operand = expr.operand
+    if not isinstance(operand, Literal):
+        return expr
+    if expr.op == "not":
+        return Literal(not operand.value, expr.loc)
+    if expr.op == "-" and isinstance(operand.value, int):
+        return Literal(-operand.value, expr.loc)
+    return expr
+
+
+def _fold_binary(expr: BinaryOp) -> Expression:
+    left, right = expr.left, expr.right
+    if not isinstance(left, Literal) or not isinstance(right, Literal):
+        return expr
+    if not isinstance(left.value, (int, str)) or not isinstance(right.value, (int, str)):
+        return expr
+    if expr.op == "*" and (isinstance(left.value, str) or isinstance(right.value, str)):
+        # Repetition can produce arbitrarily large strings; build them lazily.
+        return expr
+    folder = _FOLDABLE_OPERATORS.get(expr.op)
+    if folder is None:
+        return expr
+    try:
+        return Literal(folder(left.value, right.value), expr.loc)
+    except Exception:
+        return expr
+
+
+def _constant_list(items: list[Expression]) -> tuple[object, ...] | None:
+    values: list[object] = []
+    for item in items:
+        if isinstance(item, Literal):
+            values.append(item.value)
+        elif (
+            isinstance(item, RangeItem)
+            and isinstance(item.start, Literal)
+            and isinstance(item.end, Literal)
+            and isinstance(item.start.value, int)
+            and isinstance(item.end.value, int)
+        ):
+            start, end = item.start.value, item.end.value
+            if abs(end - start) + 1 > _MAX_CONSTANT_LIST:
+                return None
+            values.extend(range(start, end + 1) if start <= end else range(start, end - 1, -1))
+        else:
+            return None
+        if len(values) > _MAX_CONSTANT_LIST:
+            return None
+    return tuple(values)
+
+
+def analyze(program: Program) -> Program:
+    """Annotate a parsed program in place before it is executed.
+
+    Every variable name is assigned a small integer slot so the interpreter can
+    keep variables in a list instead of hashing names on each access,
+    literal regex arguments of search-style method calls are compiled once,
+    and literal semantic_search queries are collected so they can be embedded
+    in one batch before the script runs.
+    """
+    slots: dict[str, int] = {}
+    _analyze_block(program.statements, slots)
+    program.slot_names = tuple(slots)
+    program.semantic_queries = tuple(_collect_semantic_queries(program.statements))
+    return program
+
+
+def _slot_for(name: str, slots: dict[str, int]) -> int:
+    slot = slots.get(name)
+    if slot is None:
+        slot = len(slots)
+        slots[name] = slot
+    return slot
+
+
+def _analyze_block(statements: list[Statement], slots: dict[str, int]) -> None:
+    # Explicit work stack instead of recursion: deep nesting cannot hit the
+    # recursion limit and each node costs one loop iteration, not a call.
+    # Children are pushed in reverse so slots are numbered in source order.
+    stack: list[Statement | Expression] = list(reversed(statements))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Name):
+            node.slot = _slot_for(node.identifier, slots)
+        elif isinstance(node, Assign):
+            # The target gets its slot after the right-hand side is visited.
+            stack.append(_AssignTarget(node))
+            stack.append(node.expr)
+        elif isinstance(node, _AssignTarget):
+            node.stmt.slot = _slot_for(node.stmt.name, slots)
+        elif isinstance(node, ForStatement):
+            node.prefetch_content = _reads_content_of(node.var_name, node.body)
+            stack.extend(reversed(node.body))
+            stack.append(_ForTarget(node))
+            stack.append(node.iterable)
+        elif isinstance(node, _ForTarget):
+            node.stmt.var_slot = _slot_for(node.stmt.var_name, slots)
+        else:
+            if isinstance(node, Call):
+                node.compiled_pattern = _precompile_pattern(node)
+            stack.extend(reversed(_children(node)))
+
+
+class _AssignTarget:
+    __slots__ = ("stmt",)
+
+    def __init__(self, stmt: Assign) -> None:
+        self.stmt = stmt
+
+
+class _ForTarget:
+    __slots__ = ("stmt",)
+
+    def __init__(self, stmt: ForStatement) -> None:
+        self.stmt = stmt
+
+
+# Methods of File/Directory objects whose first argument is a regex pattern.
+_REGEX_METHODS = frozenset({"search", "contains", "snippets"})
+
+
+def _precompile_pattern(call: Call) -> re.Pattern[str] | None:
+    callee = call.callee
+    if not isinstance(callee, Attribute) or callee.name not in _REGEX_METHODS:
+        return None
+    if len(call.args) != 1:
+        return None
+    pattern = call.args[0]
+    if not isinstance(pattern, Literal) or not isinstance(pattern.value, str):
+        return None
+
+    ignore_case = False
+    for name, value in call.kwargs:
+        if name != "ignore_case":
+            continue
+        if not isinstance(value, Literal) or not isinstance(value.value, bool):
+            return None
+        ignore_case = value.value
+
+    try:
+        return re.compile(pattern.value, re.IGNORECASE if ignore_case else 0)
+    except re.error:
+        # Leave invalid patterns to the runtime so the error surfaces on call.
+        return None
+
+
+# File methods that need the file's extracted text.
+_CONTENT_METHODS = frozenset({"read", "search", "contains", "snippets", "head", "tail", "table"})
+
+
+def _reads_content_of(var_name: str, body: list[Statement]) -> bool:
+    """Whether a loop body calls a content method directly on the loop variable."""
+    stack: list = list(body)
+    while stack:
+        node = stack.pop()
+        if (
+            isinstance(node, Call)
+            and isinstance(node.callee, Attribute)
+            and node.callee.name in _CONTENT_METHODS
+            and isinstance(node.callee.obj, Name)
+            and node.callee.obj.identifier == var_name
+        ):
+            return True
+        stack.extend(_children(node))
+    return False
+
+
+def _collect_semantic_queries(statements: list[Statement]) -> dict[str, None]:
+    queries: dict[str, None] = {}
+    stack: list = list(reversed(statements))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Call):
+            callee = node.callee
+            if (
+                isinstance(callee, Attribute)
+                and callee.name == "semantic_search"
+                and node.args
+                and isinstance(node.args[0], Literal)
+                and isinstance(node.args[0].value, str)
+                and node.args[0].value.strip()
+            ):
+                queries.setdefault(node.args[0].value.strip())
+        stack.extend(reversed(_children(node)))
+    return queries
+
+
+def _children(node) -> list:
+    if isinstance(node, (Assign, ExprStatement)):
+        return [node.expr]
+    if isinstance(node, ForStatement):
+        return [node.iterable, *node.body]
+    if isinstance(node, IfStatement):
+        children = []
+        for condition, body in node.branches:
+            children.append(condition)
+            children.extend(body)
+        if node.else_body is not None:
+            children.extend(node.else_body)
+        return children
+    if isinstance(node, ListLiteral):
+        return list(node.items)
+    if isinstance(node, RangeItem):
+        return [node.start, node.end]
+    if isinstance(node, Attribute):
+        return [node.obj]
+    if isinstance(node, Call):
+        return [node.callee, *node.args, *(value for _, value in node.kwargs)]
+    if isinstance(node, UnaryOp):
+        return [node.operand]
+    if isinstance(node, (BinaryOp, CompareOp)):
+        return [node.left, node.right]
+    if isinstance(node, BoolOp):
+        return list(node.operands)
+    return []
@@ -1,65 +1,77 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import re
+from dataclasses import dataclass, field
 from typing import Union
 
 from .errors import SourceLocation
 
 
-@dataclass
+@dataclass(slots=True)
 class Program:
     statements: list["Statement"]
+    # Filled in by the analyzer: the variable name stored in each slot.
+    slot_names: tuple[str, ...] = ()
+    # Filled in by the analyzer: literal semantic_search queries in the script.
+    semantic_queries: tuple[str, ...] = ()
 
 
 class Statement:
+    __slots__ = ()
     loc: SourceLocation
 
 
 class Expression:
+    __slots__ = ()
     loc: SourceLocation
 
 
-@dataclass
+@dataclass(slots=True)
 class Assign(Statement):
     name: str
     expr: Expression
     loc: SourceLocation
+    slot: int = field(default=-1, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class ExprStatement(Statement):
     expr: Expression
     loc: SourceLocation
 
 
-@dataclass
+@dataclass(slots=True)
 class ForStatement(Statement):
     var_name: str
     iterable: Expression
     body: list[Statement]
     loc: SourceLocation
+    var_slot: int = field(default=-1, compare=False)
+    # Set by the analyzer when the body reads file content from the loop variable.
+    prefetch_content: bool = field(default=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class IfStatement(Statement):
     branches: list[tuple[Expression, list[Statement]]]
     else_body: list[Statement] | None
     loc: SourceLocation
 
 
-@dataclass
+@dataclass(slots=True)
 class Literal(Expression):
     value: object
     loc: SourceLocation
 
 
-@dataclass
+@dataclass(slots=True)
 class Name(Expression):
     identifier: str
     loc: SourceLocation
+    slot: int = field(default=-1, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class RangeItem(Expression):
     start: Expression
     end: Expression
@@ -69,35 +81,39 @@ class RangeItem(Expression):
 ListItem = Union[Expression, RangeItem]
 
 
-@dataclass
+@dataclass(slots=True)
 class ListLiteral(Expression):
     items: list[ListItem]
     loc: SourceLocation
+    # Set by the optimizer when every item is a literal or a literal range.
+    constant: tuple[object, ...] | None = field(default=None, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Attribute(Expression):
     obj: Expression
     name: str
     loc: SourceLocation
 
 
-@dataclass
+@dataclass(slots=True)
 class Call(Expression):
     callee: Expression
     args: list[Expression]
     kwargs: list[tuple[str, Expression]]
     loc: SourceLocation
+    # Set by the analyzer when the regex argument is a literal string.
+    compiled_pattern: re.Pattern[str] | None = field(default=None, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOp(Expression):
     op: str
     operand: Expression
     loc: SourceLocation
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOp(Expression):
     op: str
     left: Expression
@@ -105,7 +121,15 @@ class BinaryOp(Expression):
     loc: SourceLocation
 
 
-@dataclass
+@dataclass(slots=True)
+class BoolOp(Expression):
+    # `a and b and c` is one node with three operands rather than a nested chain.
+    op: str
+    operands: list[Expression]
+    loc: SourceLocation
+
+
+@dataclass(slots=True)
 class CompareOp(Expression):
     op: str
     left: Expression
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import operator
 import os
 import sys
-from io import StringIO
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import Any, TextIO
 
@@ -10,6 +11,7 @@ from .ast_nodes import (
     Assign,
     Attribute,
     BinaryOp,
+    BoolOp,
     Call,
     CompareOp,
     ExprStatement,
@@ -23,10 +25,39 @@ from .ast_nodes import (
     Statement,
     UnaryOp,
 )
+from .analyzer import analyze, optimize
 from .errors import DSLRuntimeError, DSLTimeoutError, SourceLocation
 from .execution_budget import ExecutionBudget
 from .parser import Parser
-from .runtime import DSLDirectory, DSLFile
+from .runtime import DSLDirectory, DSLFile, iter_with_prefetched_chunks
+
+
+@lru_cache(maxsize=256)
+def _parse_cached(source: str) -> Program:
+    # Programs are never mutated during execution, so one parsed AST can be
+    # shared by every interpreter running the same source.
+    return analyze(optimize(Parser(source).parse()))
+
+
+# Marks a variable slot that has not been assigned yet.
+_UNSET = object()
+
+_BINARY_OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod,
+}
+
+_COMPARE_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
 
 
 class Interpreter:
@@ -40,194 +71,244 @@ class Interpreter:
         budget: ExecutionBudget | None = None,
     ) -> None:
         self.source = source
-        self.source_lines = source.splitlines()
         self.cwd = (cwd or Path.cwd()).resolve()
         self.sandbox_root = (sandbox_root or self.cwd).resolve()
+        self._cwd_str = str(self.cwd)
+        self._sandbox_root_str = str(self.sandbox_root)
+        self._path_cache: dict[str, Path] = {}
         self.stdout = stdout if stdout is not None else sys.stdout
         self.budget = budget if budget is not None else ExecutionBudget(timeout_s=None)
         self.variables: dict[str, Any] = {}
+        self._slots: list[Any] = []
+        self._builtin_slots: tuple[Any, ...] = ()
         self.builtins = {
             "Directory": self._builtin_directory,
             "File": self._builtin_file,
             "print": self._builtin_print,
             "len": len,
         }
+        self._stmt_dispatch = {
+            Assign: self._exec_assign,
+            ExprStatement: self._exec_expr_stmt,
+            ForStatement: self._exec_for,
+            IfStatement: self._exec_if,
+        }
+        self._expr_dispatch = {
+            Literal: self._eval_literal,
+            Name: self._eval_name,
+            ListLiteral: self._eval_list_literal,
+            RangeItem: self._eval_range_error,
+            Attribute: self._eval_attribute,
+            Call: self._eval_call,
+            UnaryOp: self._eval_unary,
+            BinaryOp: self._eval_binary,
+            BoolOp: self._eval_bool_op,
+            CompareOp: self._eval_compare,
+        }
 
     def run(self) -> dict[str, Any]:
-        program = Parser(self.source).parse()
-        self._execute_program(program)
+        program = _parse_cached(self.source)
+        self._slots = [_UNSET] * len(program.slot_names)
+        self._builtin_slots = tuple(self.builtins.get(name, _UNSET) for name in program.slot_names)
+        if program.semantic_queries:
+            from .semantic import prime_query_vectors
+
+            prime_query_vectors(list(program.semantic_queries), budget=self.budget)
+        try:
+            self._execute_program(program)
+        finally:
+            # Bindings made before a failure stay visible to the caller.
+            self.variables = {
+                name: value
+                for name, value in zip(program.slot_names, self._slots)
+                if value is not _UNSET
+            }
         return self.variables
 
     def _execute_program(self, program: Program) -> None:
-        for statement in program.statements:
-            self.budget.check("execute_program")
-            self._execute_statement(statement)
+        self.budget.check("execute_program")
+        self._execute_block(program.statements)
+
+    def _execute_block(self, statements: list[Statement]) -> None:
+        # Bind the hot lookups once per block instead of once per statement.
+        check = self.budget.check
+        dispatch = self._stmt_dispatch
+        for stmt in statements:
+            check("execute_statement")
+            try:
+                handler = dispatch.get(type(stmt))
+                if handler is None:
+                    self._runtime_error("Unsupported statement", stmt.loc)
+                handler(stmt)
+            except DSLRuntimeError:
+                raise
+            except Exception as exc:  # pragma: no cover
+                self._runtime_error(str(exc), stmt.loc)
 
-    def _execute_statement(self, stmt: Statement) -> None:
-        self.budget.check("execute_statement")
-        try:
-            if isinstance(stmt, Assign):
-                self.variables[stmt.name] = self._eval_expr(stmt.expr)
-                return
+    def _exec_assign(self, stmt: Assign) -> None:
+        self._slots[stmt.slot] = self._eval_expr(stmt.expr)
 
-            if isinstance(stmt, ExprStatement):
-                self._eval_expr(stmt.expr)
-                return
+    def _exec_expr_stmt(self, stmt: ExprStatement) -> None:
+        self._eval_expr(stmt.expr)
 
-            if isinstance(stmt, ForStatement):
-                iterable = self._eval_expr(stmt.iterable)
-                if not hasattr(iterable, "__iter__"):
-                    self._runtime_error("for-loop target is not iterable", stmt.loc)
-                for value in iterable:
-                    self.budget.check("execute_statement.for_iteration")
-                    self.variables[stmt.var_name] = value
-                    for child_stmt in stmt.body:
-                        self._execute_statement(child_stmt)
+    def _exec_for(self, stmt: ForStatement) -> None:
+        source = stmt.iterable
+        if (
+            type(source) is ListLiteral
+            and len(source.items) == 1
+            and type(source.items[0]) is RangeItem
+        ):
+            # `for i in [a:b]` walks the range directly; the list is never observable.
+            iterable = self._eval_range(source.items[0])
+        else:
+            iterable = self._eval_expr(source)
+        if not hasattr(iterable, "__iter__"):
+            self._runtime_error("for-loop target is not iterable", stmt.loc)
+        if (
+            stmt.prefetch_content
+            and type(iterable) is list
+            and all(type(item) is DSLFile for item in iterable)
+        ):
+            iterable = iter_with_prefetched_chunks(iterable)
+        check = self.budget.check
+        slots = self._slots
+        var_slot = stmt.var_slot
+        execute_block = self._execute_block
+        body = stmt.body
+        for value in iterable:
+            check("execute_statement.for_iteration")
+            slots[var_slot] = value
+            execute_block(body)
+
+    def _exec_if(self, stmt: IfStatement) -> None:
+        for condition, body in stmt.branches:
+            if self._is_truthy(self._eval_expr(condition)):
+                self._execute_block(body)
                 return
+        if stmt.else_body is not None:
+            self._execute_block(stmt.else_body)
 
-            if isinstance(stmt, IfStatement):
-                for condition, body in stmt.branches:
-                    if self._is_truthy(self._eval_expr(condition)):
-                        for child_stmt in body:
-                            self._execute_statement(child_stmt)
-                        return
-                if stmt.else_body is not None:
-                    for child_stmt in stmt.else_body:
-                        self._execute_statement(child_stmt)
-                return
+    def _eval_expr(self, expr):
+        self.budget.check("eval_expr")
+        handler = self._expr_dispatch.get(type(expr))
+        if handler is None:
+            self._runtime_error("Unsupported expression", expr.loc)
+        return handler(expr)
+
+    def _eval_literal(self, expr: Literal):
+        return expr.value
+
+    def _eval_name(self, expr: Name):
+        value = self._slots[expr.slot]
+        if value is _UNSET:
+            value = self._builtin_slots[expr.slot]
+            if value is _UNSET:
+                self._runtime_error(f"Undefined variable '{expr.identifier}'", expr.loc)
+        return value
+
+    def _eval_range_error(self, expr: RangeItem):
+        self._runtime_error("Range syntax is only valid inside list literals", expr.loc)
 
-            self._runtime_error("Unsupported statement", stmt.loc)
+    def _eval_attribute(self, expr: Attribute):
+        obj = self._eval_expr(expr.obj)
+        if not hasattr(obj, expr.name):
+            self._runtime_error(
+                f"Object of type '{type(obj).__name__}' has no attribute '{expr.name}'",
+                expr.loc,
+            )
+        return getattr(obj, expr.name)
+
+    def _eval_call(self, expr: Call):
+        self.budget.check("eval_expr.call")
+        callee = self._eval_expr(expr.callee)
+        if not callable(callee):
+            self._runtime_error("Attempted to call a non-callable value", expr.loc)
+
+        args = []
+        for arg in expr.args:
+            self.budget.check("eval_expr.call.arg")
+            args.append(self._eval_expr(arg))
+        if expr.compiled_pattern is not None:
+            args[0] = expr.compiled_pattern
+        kwargs = {}
+        for name, value in expr.kwargs:
+            self.budget.check("eval_expr.call.kwarg")
+            kwargs[name] = self._eval_expr(value)
+        try:
+            self.budget.check("eval_expr.call.invoke")
+            return callee(*args, **kwargs)
+        except TypeError as exc:
+            self._runtime_error(f"Call failed: {exc}", expr.loc)
         except DSLRuntimeError:
             raise
         except Exception as exc:  # pragma: no cover
-            self._runtime_error(str(exc), stmt.loc)
-
-    def _eval_expr(self, expr):
-        self.budget.check("eval_expr")
-        if isinstance(expr, Literal):
-            return expr.value
-
-        if isinstance(expr, Name):
-            if expr.identifier in self.variables:
-                return self.variables[expr.identifier]
-            if expr.identifier in self.builtins:
-                return self.builtins[expr.identifier]
-            self._runtime_error(f"Undefined variable '{expr.identifier}'", expr.loc)
-
-        if isinstance(expr, ListLiteral):
-            return self._eval_list_literal(expr)
-
-        if isinstance(expr, RangeItem):
-            self._runtime_error("Range syntax is only valid inside list literals", expr.loc)
-
-        if isinstance(expr, Attribute):
-            obj = self._eval_expr(expr.obj)
-            if not hasattr(obj, expr.name):
-                self._runtime_error(
-                    f"Object of type '{type(obj).__name__}' has no attribute '{expr.name}'",
-                    expr.loc,
-                )
-            return getattr(obj, expr.name)
-
-        if isinstance(expr, Call):
-            self.budget.check("eval_expr.call")
-            callee = self._eval_expr(expr.callee)
-            if not callable(callee):
-                self._runtime_error("Attempted to call a non-callable value", expr.loc)
-
-            args = []
-            for arg in expr.args:
-                self.budget.check("eval_expr.call.arg")
-                args.append(self._eval_expr(arg))
-            kwargs = {}
-            for name, value in expr.kwargs:
-                self.budget.check("eval_expr.call.kwarg")
-                kwargs[name] = self._eval_expr(value)
+            self._runtime_error(str(exc), expr.loc)
+
+    def _eval_unary(self, expr: UnaryOp):
+        operand = self._eval_expr(expr.operand)
+        if expr.op == "not":
+            return not self._is_truthy(operand)
+        if expr.op == "-":
+            if not isinstance(operand, int):
+                self._runtime_error("Unary '-' expects an integer", expr.loc)
+            return -operand
+        self._runtime_error(f"Unsupported unary operator '{expr.op}'", expr.loc)
+
+    def _eval_bool_op(self, expr: BoolOp) -> bool:
+        if expr.op == "and":
+            for operand in expr.operands:
+                if not self._is_truthy(self._eval_expr(operand)):
+                    return False
+            return True
+        if expr.op == "or":
+            for operand in expr.operands:
+                if self._is_truthy(self._eval_expr(operand)):
+                    return True
+            return False
+        self._runtime_error(f"Unsupported boolean operator '{expr.op}'", expr.loc)
+
+    def _eval_binary(self, expr: BinaryOp):
+        left = self._eval_expr(expr.left)
+        right = self._eval_expr(expr.right)
+        op_fn = _BINARY_OPERATORS.get(expr.op)
+        if op_fn is None:
+            self._runtime_error(f"Unsupported binary operator '{expr.op}'", expr.loc)
+        return op_fn(left, right)
+
+    def _eval_compare(self, expr: CompareOp):
+        left = self._eval_expr(expr.left)
+        right = self._eval_expr(expr.right)
+        op_fn = _COMPARE_OPERATORS.get(expr.op)
+        if op_fn is not None:
+            return op_fn(left, right)
+        if expr.op == "in":
             try:
-                self.budget.check("eval_expr.call.invoke")
-                return callee(*args, **kwargs)
+                return left in right
             except TypeError as exc:
-                self._runtime_error(f"Call failed: {exc}", expr.loc)
-            except DSLRuntimeError:
-                raise
-            except Exception as exc:  # pragma: no cover
                 self._runtime_error(str(exc), expr.loc)
-
-        if isinstance(expr, UnaryOp):
-            operand = self._eval_expr(expr.operand)
-            if expr.op == "not":
-                return not self._is_truthy(operand)
-            if expr.op == "-":
-                if not isinstance(operand, int):
-                    self._runtime_error("Unary '-' expects an integer", expr.loc)
-                return -operand
-            self._runtime_error(f"Unsupported unary operator '{expr.op}'", expr.loc)
-
-        if isinstance(expr, BinaryOp):
-            if expr.op == "and":
-                return self._is_truthy(self._eval_expr(expr.left)) and self._is_truthy(
-                    self._eval_expr(expr.right)
-                )
-            if expr.op == "or":
-                return self._is_truthy(self._eval_expr(expr.left)) or self._is_truthy(
-                    self._eval_expr(expr.right)
-                )
-
-            left = self._eval_expr(expr.left)
-            right = self._eval_expr(expr.right)
-            if expr.op == "+":
-                return left + right
-            if expr.op == "-":
-                return left - right
-            if expr.op == "*":
-                return left * right
-            if expr.op == "/":
-                return left / right
-            if expr.op == "%":
-                return left % right
-            self._runtime_error(f"Unsupported binary operator '{expr.op}'", expr.loc)
-
-        if isinstance(expr, CompareOp):
-            left = self._eval_expr(expr.left)
-            right = self._eval_expr(expr.right)
-            if expr.op == "==":
-                return left == right
-            if expr.op == "!=":
-                return left != right
-            if expr.op == "<":
-                return left < right
-            if expr.op == "<=":
-                return left <= right
-            if expr.op == ">":
-                return left > right
-            if expr.op == ">=":
-                return left >= right
-            if expr.op == "in":
-                try:
-                    return left in right
-                except TypeError as exc:
-                    self._runtime_error(str(exc), expr.loc)
-            self._runtime_error(f"Unsupported comparison operator '{expr.op}'", expr.loc)
-
-        self._runtime_error("Unsupported expression", expr.loc)
+        self._runtime_error(f"Unsupported comparison operator '{expr.op}'", expr.loc)
 
     def _eval_list_literal(self, node: ListLiteral) -> list[Any]:
+        if node.constant is not None:
+            return list(node.constant)
         values: list[Any] = []
         for item in node.items:
             self.budget.check("eval_list_literal.item")
             if isinstance(item, RangeItem):
-                start = self._eval_expr(item.start)
-                end = self._eval_expr(item.end)
-                if not isinstance(start, int) or not isinstance(end, int):
-                    self._runtime_error("Range bounds must be integers", item.loc)
-                if start <= end:
-                    values.extend(range(start, end + 1))
-                else:
-                    values.extend(range(start, end - 1, -1))
+                values.extend(self._eval_range(item))
                 continue
             values.append(self._eval_expr(item))
         return values
 
+    def _eval_range(self, item: RangeItem) -> range:
+        start = self._eval_expr(item.start)
+        end = self._eval_expr(item.end)
+        if not isinstance(start, int) or not isinstance(end, int):
+            self._runtime_error("Range bounds must be integers", item.loc)
+        if start <= end:
+            return range(start, end + 1)
+        return range(start, end - 1, -1)
+
     def _builtin_directory(self, path: str, recursive: bool = True):
         candidate = self._resolve_sandboxed_path(path, "Directory")
         if not isinstance(recursive, bool):
@@ -268,30 +349,42 @@ class Interpreter:
     def _resolve_sandboxed_path(self, path: str, ctor_name: str) -> Path:
         if not isinstance(path, str):
             raise DSLRuntimeError(f"{ctor_name}(path) expects a string path")
-        candidate = Path(path)
-        if not candidate.is_absolute():
-            candidate = (self.cwd / candidate).resolve()
-        else:
-            candidate = candidate.resolve()
-        if not candidate.is_relative_to(self.sandbox_root):
+        cached = self._path_cache.get(path)
+        if cached is not None:
+            return cached
+        # realpath still follows symlinks, so links cannot escape the sandbox;
+        # the containment check itself is a plain string comparison.
+        candidate_str = os.path.realpath(os.path.join(self._cwd_str, path))
+        root = self._sandbox_root_str
+        if candidate_str != root and not candidate_str.startswith(
+            root if root.endswith(os.sep) else root + os.sep
+        ):
+            candidate = Path(candidate_str)
             raise DSLRuntimeError(
                 f"Access denied. '{self._display_path(candidate)}' is outside sandbox root "
                 f"'{self._display_path(self.sandbox_root)}'"
             )
+        candidate = Path(candidate_str)
+        self._path_cache[path] = candidate
         return candidate
 
     def _builtin_print(self, *args) -> None:
-        rendered = [self._render_value(arg) for arg in args]
-        print(*rendered, file=self.stdout)
+        render = self._render_value
+        print(*[render(arg) if type(arg) is list else arg for arg in args], file=self.stdout)
 
     def _render_value(self, value: Any) -> Any:
-        if isinstance(value, list):
+        if type(value) is list:
             return [self._render_value(item) for item in value]
         return value
 
     def _is_truthy(self, value: Any) -> bool:
         return bool(value)
 
+    @cached_property
+    def source_lines(self) -> list[str]:
+        # Only needed to render error context, so split lazily.
+        return self.source.splitlines()
+
     def _runtime_error(self, message: str, loc: SourceLocation | None = None) -> None:
         if loc is None:
             raise DSLRuntimeError(message)
@@ -324,6 +417,23 @@ def run_script(
     return interpreter.run()
 
 
+class _ListWriter:
+    """Minimal text sink that collects writes and joins them once at the end."""
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+
+    def write(self, text: str) -> int:
+        self._parts.append(text)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def getvalue(self) -> str:
+        return "".join(self._parts)
+
+
 def execute_fdsl(
     code: str,
     *,
@@ -344,7 +454,7 @@ def execute_fdsl(
     """
     resolved_cwd = Path(cwd).resolve() if cwd is not None else None
     resolved_sandbox = Path(sandbox_root).resolve() if sandbox_root is not None else None
-    output = StringIO()
+    output = _ListWriter()
     budget = ExecutionBudget(timeout_s=timeout_s)
     try:
         run_script(
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import re
+import sys
+from collections.abc import Sequence
 from dataclasses import dataclass
+from functools import lru_cache
 
 from .ast_nodes import (
     Assign,
     Attribute,
     BinaryOp,
+    BoolOp,
     Call,
     CompareOp,
     ExprStatement,
@@ -24,18 +28,107 @@ from .errors import DSLSyntaxError, SourceLocation
 
 
 _IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_match_identifier = _IDENTIFIER_RE.match
 _FOR_RE = re.compile(r"^for\s+([A-Za-z_][A-Za-z0-9_]*)\s+in\s+(.+):\s*$")
 _IF_RE = re.compile(r"^if\s+(.+):\s*$")
 _ELIF_RE = re.compile(r"^elif\s+(.+):\s*$")
 
+# One alternation per token class; the lexer dispatches on ``lastgroup``.
+# \s, \d and \w follow str.isspace()/isdecimal()/isalnum() for non-ASCII text.
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<WS>\s+)
+    | (?P<OP>==|!=|<=|>=|[-+*/%()\[\],.:=<>])
+    | (?P<NUMBER>\d+)
+    | (?P<STRING>['"])
+    | (?P<NAME>[^\W\d]\w*)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
 
-@dataclass
+_STRING_BODY_RES = {
+    quote: re.compile(rf"{quote}((?:[^{quote}\\]|\\.)*)({quote}?)", re.DOTALL) for quote in "'\""
+}
+
+_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+
+_ESCAPES = {
+    "n": "\n",
+    "t": "\t",
+    "r": "\r",
+    "\\": "\\",
+    "'": "'",
+    '"': '"',
+}
+
+_PUNCTUATION_TOKENS = {
+    "==": "EQEQ",
+    "!=": "NEQ",
+    "<=": "LTE",
+    ">=": "GTE",
+    "+": "PLUS",
+    "-": "MINUS",
+    "*": "STAR",
+    "/": "SLASH",
+    "%": "PERCENT",
+    "(": "LPAREN",
+    ")": "RPAREN",
+    "[": "LBRACK",
+    "]": "RBRACK",
+    ",": "COMMA",
+    ".": "DOT",
+    ":": "COLON",
+    "=": "EQ",
+    "<": "LT",
+    ">": "GT",
+}
+
+# Precedence climbing: binary operator token kind -> (precedence, AST operator,
+# node type). Higher binds tighter; all binary operators are left-associative,
+# and runs of the same and/or operator become a single BoolOp.
+_NOT_PRECEDENCE = 3
+_UNARY_MINUS_PRECEDENCE = 7
+_BINARY_OPERATORS = {
+    "OR": (1, "or", BoolOp),
+    "AND": (2, "and", BoolOp),
+    "EQEQ": (4, "==", CompareOp),
+    "NEQ": (4, "!=", CompareOp),
+    "LT": (4, "<", CompareOp),
+    "LTE": (4, "<=", CompareOp),
+    "GT": (4, ">", CompareOp),
+    "GTE": (4, ">=", CompareOp),
+    "IN": (4, "in", CompareOp),
+    "PLUS": (5, "+", BinaryOp),
+    "MINUS": (5, "-", BinaryOp),
+    "STAR": (6, "*", BinaryOp),
+    "SLASH": (6, "/", BinaryOp),
+    "PERCENT": (6, "%", BinaryOp),
+}
+
+_KEYWORD_TOKENS = {
+    "and": "AND",
+    "or": "OR",
+    "not": "NOT",
+    "in": "IN",
+    "True": "TRUE",
+    "False": "FALSE",
+    "true": "TRUE",
+    "false": "FALSE",
+}
+
+
+@dataclass(slots=True)
 class Token:
     kind: str
     value: str
     column: int
 
 
+def _unescape(match: re.Match[str]) -> str:
+    escaped = match.group(1)
+    return _ESCAPES.get(escaped, escaped)
+
+
 class ExpressionLexer:
     def __init__(self, text: str, base_column: int, line: int, source_line: str) -> None:
         self.text = text
@@ -48,157 +141,137 @@ class ExpressionLexer:
         return DSLSyntaxError(message, self.line, self.base_column + column, self.source_line)
 
     def tokenize(self) -> list[Token]:
+        text = self.text
+        length = len(text)
         tokens: list[Token] = []
-        while self.index < len(self.text):
-            char = self.text[self.index]
-            if char.isspace():
-                self.index += 1
-                continue
-
+        append = tokens.append
+        match = _TOKEN_RE.match
+        while self.index < length:
             start = self.index
-            two_char = self.text[self.index : self.index + 2]
-            if two_char in {"==", "!=", "<=", ">="}:
-                mapping = {
-                    "==": "EQEQ",
-                    "!=": "NEQ",
-                    "<=": "LTE",
-                    ">=": "GTE",
-                }
-                tokens.append(Token(mapping[two_char], two_char, start))
-                self.index += 2
-                continue
-
-            if char in "+-*/%()[],.:=<>":
-                mapping = {
-                    "+": "PLUS",
-                    "-": "MINUS",
-                    "*": "STAR",
-                    "/": "SLASH",
-                    "%": "PERCENT",
-                    "(": "LPAREN",
-                    ")": "RPAREN",
-                    "[": "LBRACK",
-                    "]": "RBRACK",
-                    ",": "COMMA",
-                    ".": "DOT",
-                    ":": "COLON",
-                    "=": "EQ",
-                    "<": "LT",
-                    ">": "GT",
-                }
-                tokens.append(Token(mapping[char], char, start))
-                self.index += 1
-                continue
-
-            if char.isdigit():
-                self.index += 1
-                while self.index < len(self.text) and self.text[self.index].isdigit():
-                    self.index += 1
-                value = self.text[start : self.index]
-                tokens.append(Token("NUMBER", value, start))
-                continue
-
-            if char in {"'", '"'}:
-                tokens.append(self._read_string())
+            m = match(text, start)
+            if m is None:
+                raise self._error(f"Unexpected character '{text[start]}'", start)
+            self.index = m.end()
+            group = m.lastgroup
+            value = m.group()
+            if group == "WS":
                 continue
-
-            if char.isalpha() or char == "_":
-                self.index += 1
-                while self.index < len(self.text):
-                    ch = self.text[self.index]
-                    if ch.isalnum() or ch == "_":
-                        self.index += 1
-                        continue
-                    break
-                value = self.text[start : self.index]
-                keyword_map = {
-                    "and": "AND",
-                    "or": "OR",
-                    "not": "NOT",
-                    "in": "IN",
-                    "True": "TRUE",
-                    "False": "FALSE",
-                    "true": "TRUE",
-                    "false": "FALSE",
-                }
-                kind = keyword_map.get(value, "NAME")
-                tokens.append(Token(kind, value, start))
-                continue
-
-            raise self._error(f"Unexpected character '{char}'", start)
-
-        tokens.append(Token("EOF", "", len(self.text)))
+            if group == "NAME":
+                if not (value[0].isalpha() or value[0] == "_"):
+                    raise self._error(f"Unexpected character '{value[0]}'", start)
+                kind = _KEYWORD_TOKENS.get(value)
+                if kind is None:
+                    # Identifiers end up as variable, attribute and kwarg names.
+                    kind = "NAME"
+                    value = sys.intern(value)
+                append(Token(kind, value, start))
+            elif group == "STRING":
+                self.index = start
+                append(self._read_string())
+            elif group == "NUMBER":
+                append(Token("NUMBER", value, start))
+            else:
+                append(Token(_PUNCTUATION_TOKENS[value], value, start))
+
+        append(Token("EOF", "", length))
         return tokens
 
     def _read_string(self) -> Token:
-        quote = self.text[self.index]
         start = self.index
-        self.index += 1
-        output: list[str] = []
-        while self.index < len(self.text):
-            char = self.text[self.index]
-            if char == quote:
-                self.index += 1
-                return Token("STRING", "".join(output), start)
-            if char == "\\":
-                if self.index + 1 >= len(self.text):
-                    raise self._error("Unterminated escape in string literal", start)
-                escaped = self.text[self.index + 1]
-                escape_map = {
-                    "n": "\n",
-                    "t": "\t",
-                    "r": "\r",
-                    "\\": "\\",
-                    "'": "'",
-                    '"': '"',
-                }
-                output.append(escape_map.get(escaped, escaped))
-                self.index += 2
-                continue
-            output.append(char)
-            self.index += 1
+        # The body pattern consumes everything up to the closing quote, or up
+        # to the end of the text except a dangling trailing backslash.
+        match = _STRING_BODY_RES[self.text[start]].match(self.text, start)
+        body = match.group(1)
+        if match.group(2):
+            self.index = match.end()
+            if "\\" in body:
+                body = _ESCAPE_RE.sub(_unescape, body)
+            return Token("STRING", body, start)
+        if match.end() < len(self.text):
+            raise self._error("Unterminated escape in string literal", start)
         raise self._error("Unterminated string literal", start)
 
 
+@lru_cache(maxsize=2048)
+def _tokenize_cached(text: str) -> tuple[tuple[str, ...], tuple[Token, ...]]:
+    # Token columns are relative to ``text``, so the token stream of a fragment
+    # can be shared by every line that repeats it. Kinds are kept as a separate
+    # tuple because the parser inspects them far more often than whole tokens.
+    tokens = tuple(ExpressionLexer(text, base_column=0, line=0, source_line=text).tokenize())
+    return tuple(token.kind for token in tokens), tokens
+
+
 class ExpressionParser:
-    def __init__(self, tokens: list[Token], line: int, source_line: str, base_column: int) -> None:
+    def __init__(
+        self,
+        tokens: Sequence[Token],
+        line: int,
+        source_line: str,
+        base_column: int,
+        kinds: Sequence[str] | None = None,
+    ) -> None:
         self.tokens = tokens
+        self.kinds = kinds if kinds is not None else tuple(token.kind for token in tokens)
         self.line = line
         self.source_line = source_line
         self.base_column = base_column
         self.index = 0
 
     def parse(self):
-        expr = self._parse_or()
-        if self._current().kind != "EOF":
+        if len(self.kinds) <= 4:
+            expr = self._parse_trivial()
+            if expr is not None:
+                return expr
+        expr = self._parse_expr()
+        if self.kinds[self.index] != "EOF":
             token = self._current()
             self._error(f"Unexpected token '{token.value or token.kind}'", token)
         return expr
 
+    def _parse_trivial(self):
+        # Bare names, literals and `name.attr` make up most expressions; build
+        # them directly instead of running the precedence loop.
+        kinds = self.kinds
+        tokens = self.tokens
+        if len(kinds) == 2:
+            kind = kinds[0]
+            token = tokens[0]
+            if kind == "NAME":
+                return Name(token.value, self._loc(token))
+            if kind == "STRING":
+                return Literal(token.value, self._loc(token))
+            if kind == "NUMBER":
+                return Literal(int(token.value), self._loc(token))
+            if kind == "TRUE" or kind == "FALSE":
+                return Literal(kind == "TRUE", self._loc(token))
+        elif kinds == ("NAME", "DOT", "NAME", "EOF"):
+            obj = Name(tokens[0].value, self._loc(tokens[0]))
+            return Attribute(obj, tokens[2].value, self._loc(tokens[1]))
+        return None
+
     def _current(self) -> Token:
         return self.tokens[self.index]
 
-    def _peek(self, n: int = 1) -> Token:
+    def _peek_kind(self, n: int = 1) -> str:
         idx = self.index + n
-        if idx >= len(self.tokens):
-            return self.tokens[-1]
-        return self.tokens[idx]
+        if idx >= len(self.kinds):
+            return self.kinds[-1]
+        return self.kinds[idx]
 
     def _advance(self) -> Token:
         token = self.tokens[self.index]
         self.index += 1
         return token
 
-    def _match(self, *kinds: str) -> Token | None:
-        token = self._current()
-        if token.kind in kinds:
+    def _match(self, kind: str) -> Token | None:
+        if self.kinds[self.index] == kind:
             self.index += 1
-            return token
+            return self.tokens[self.index - 1]
         return None
 
     def _expect(self, kind: str, message: str) -> Token:
-        token = self._current()
-        if token.kind != kind:
+        token = self.tokens[self.index]
+        if self.kinds[self.index] != kind:
             self._error(message, token)
         self.index += 1
         return token
@@ -214,72 +287,50 @@ class ExpressionParser:
     def _loc(self, token: Token) -> SourceLocation:
         return SourceLocation(self.line, self.base_column + token.column)
 
-    def _parse_or(self):
-        expr = self._parse_and()
-        while token := self._match("OR"):
-            right = self._parse_and()
-            expr = BinaryOp("or", expr, right, self._loc(token))
-        return expr
-
-    def _parse_and(self):
-        expr = self._parse_not()
-        while token := self._match("AND"):
-            right = self._parse_not()
-            expr = BinaryOp("and", expr, right, self._loc(token))
-        return expr
-
-    def _parse_not(self):
-        if token := self._match("NOT"):
-            operand = self._parse_not()
-            return UnaryOp("not", operand, self._loc(token))
-        return self._parse_compare()
-
-    def _parse_compare(self):
-        expr = self._parse_add()
+    def _parse_expr(self, min_prec: int = 1):
+        kinds = self.kinds
+        # Collect leading `not`/`-` iteratively; each one's operand extends up
+        # to its own precedence level, so `not not x` and `- - x` need no
+        # recursion and `not a == b` still negates the whole comparison.
+        prefixes: list[tuple[Token, str, int]] = []
+        level = min_prec
         while True:
-            token = self._match("EQEQ", "NEQ", "LT", "LTE", "GT", "GTE", "IN")
-            if token is None:
+            kind = kinds[self.index]
+            if kind == "NOT" and level <= _NOT_PRECEDENCE:
+                level = _NOT_PRECEDENCE
+                prefixes.append((self.tokens[self.index], "not", level))
+            elif kind == "MINUS":
+                level = _UNARY_MINUS_PRECEDENCE
+                prefixes.append((self.tokens[self.index], "-", level))
+            else:
                 break
-            op_map = {
-                "EQEQ": "==",
-                "NEQ": "!=",
-                "LT": "<",
-                "LTE": "<=",
-                "GT": ">",
-                "GTE": ">=",
-                "IN": "in",
-            }
-            right = self._parse_add()
-            expr = CompareOp(op_map[token.kind], expr, right, self._loc(token))
-        return expr
+            self.index += 1
 
-    def _parse_add(self):
-        expr = self._parse_mul()
-        while True:
-            token = self._match("PLUS", "MINUS")
-            if token is None:
-                break
-            op = "+" if token.kind == "PLUS" else "-"
-            right = self._parse_mul()
-            expr = BinaryOp(op, expr, right, self._loc(token))
-        return expr
+        expr = self._parse_postfix()
+        for token, op, prefix_level in reversed(prefixes):
+            expr = UnaryOp(op, self._parse_binary_tail(expr, prefix_level), self._loc(token))
+        return self._parse_binary_tail(expr, min_prec)
 
-    def _parse_mul(self):
-        expr = self._parse_unary()
+    def _parse_binary_tail(self, expr, min_prec: int):
+        kinds = self.kinds
         while True:
-            token = self._match("STAR", "SLASH", "PERCENT")
-            if token is None:
-                break
-            op_map = {"STAR": "*", "SLASH": "/", "PERCENT": "%"}
-            right = self._parse_unary()
-            expr = BinaryOp(op_map[token.kind], expr, right, self._loc(token))
-        return expr
-
-    def _parse_unary(self):
-        if token := self._match("MINUS"):
-            operand = self._parse_unary()
-            return UnaryOp("-", operand, self._loc(token))
-        return self._parse_postfix()
+            binary = _BINARY_OPERATORS.get(kinds[self.index])
+            if binary is None or binary[0] < min_prec:
+                return expr
+            prec, op, node_type = binary
+            token = self.tokens[self.index]
+            self.index += 1
+            if node_type is BoolOp:
+                # Gather the whole run of this and/or into one flat node.
+                operator_kind = kinds[self.index - 1]
+                operands = [expr, self._parse_expr(prec + 1)]
+                while kinds[self.index] == operator_kind:
+                    self.index += 1
+                    operands.append(self._parse_expr(prec + 1))
+                expr = BoolOp(op, operands, self._loc(token))
+                continue
+            right = self._parse_expr(prec + 1)
+            expr = node_type(op, expr, right, self._loc(token))
 
     def _parse_postfix(self):
         expr = self._parse_primary()
@@ -288,7 +339,7 @@ class ExpressionParser:
                 name_token = self._expect("NAME", "Expected attribute name after '.'")
                 expr = Attribute(expr, name_token.value, self._loc(token))
                 continue
-            if self._current().kind == "LPAREN":
+            if self.kinds[self.index] == "LPAREN":
                 expr = self._parse_call(expr)
                 continue
             break
@@ -298,16 +349,18 @@ class ExpressionParser:
         lparen = self._expect("LPAREN", "Expected '('")
         args = []
         kwargs = []
+        seen_keywords: set[str] = set()
         seen_keyword = False
-        if self._current().kind != "RPAREN":
+        if self.kinds[self.index] != "RPAREN":
             while True:
-                if self._current().kind == "NAME" and self._peek().kind == "EQ":
+                if self.kinds[self.index] == "NAME" and self._peek_kind() == "EQ":
                     seen_keyword = True
                     key = self._advance().value
                     self._advance()  # EQ
-                    value = self._parse_or()
-                    if any(existing == key for existing, _ in kwargs):
+                    value = self._parse_expr()
+                    if key in seen_keywords:
                         self._error(f"Duplicate keyword argument '{key}'", self._current())
+                    seen_keywords.add(key)
                     kwargs.append((key, value))
                 else:
                     if seen_keyword:
@@ -315,10 +368,10 @@ class ExpressionParser:
                             "Positional arguments cannot follow keyword arguments",
                             self._current(),
                         )
-                    args.append(self._parse_or())
+                    args.append(self._parse_expr())
 
                 if self._match("COMMA"):
-                    if self._current().kind == "RPAREN":
+                    if self.kinds[self.index] == "RPAREN":
                         break
                     continue
                 break
@@ -326,44 +379,45 @@ class ExpressionParser:
         return Call(callee, args, kwargs, self._loc(lparen))
 
     def _parse_primary(self):
-        token = self._current()
-        if token.kind == "NUMBER":
+        token = self.tokens[self.index]
+        kind = self.kinds[self.index]
+        if kind == "NUMBER":
             self._advance()
             return Literal(int(token.value), self._loc(token))
-        if token.kind == "STRING":
+        if kind == "STRING":
             self._advance()
             return Literal(token.value, self._loc(token))
-        if token.kind == "TRUE":
+        if kind == "TRUE":
             self._advance()
             return Literal(True, self._loc(token))
-        if token.kind == "FALSE":
+        if kind == "FALSE":
             self._advance()
             return Literal(False, self._loc(token))
-        if token.kind == "NAME":
+        if kind == "NAME":
             self._advance()
             return Name(token.value, self._loc(token))
-        if token.kind == "LPAREN":
+        if kind == "LPAREN":
             self._advance()
-            expr = self._parse_or()
+            expr = self._parse_expr()
             self._expect("RPAREN", "Expected ')' after expression")
             return expr
-        if token.kind == "LBRACK":
+        if kind == "LBRACK":
             return self._parse_list()
         self._error("Expected expression", token)
 
     def _parse_list(self):
         lbrack = self._expect("LBRACK", "Expected '['")
         items = []
-        if self._current().kind != "RBRACK":
+        if self.kinds[self.index] != "RBRACK":
             while True:
-                item = self._parse_or()
+                item = self._parse_expr()
                 if colon := self._match("COLON"):
-                    end = self._parse_or()
+                    end = self._parse_expr()
                     items.append(RangeItem(item, end, self._loc(colon)))
                 else:
                     items.append(item)
                 if self._match("COMMA"):
-                    if self._current().kind == "RBRACK":
+                    if self.kinds[self.index] == "RBRACK":
                         break
                     continue
                 break
@@ -376,6 +430,17 @@ class Parser:
         self.source = source
         self.lines = source.splitlines()
         self.index = 0
+        # One pass over the source: (indent, comment-stripped code, column of a
+        # tab in the indentation or 0). The block parsers only index this list.
+        self._pre: list[tuple[int, str, int]] = [self._prescan(line) for line in self.lines]
+        # _next_significant[i] is the first non-blank line at or after i
+        # (len(lines) when none), so lookahead skips blank runs in one step.
+        self._next_significant = [len(self.lines)] * (len(self.lines) + 1)
+        for index in range(len(self.lines) - 1, -1, -1):
+            if self._pre[index][1].strip():
+                self._next_significant[index] = index
+            else:
+                self._next_significant[index] = self._next_significant[index + 1]
 
     def parse(self) -> Program:
         statements = self._parse_block(expected_indent=0)
@@ -384,14 +449,25 @@ class Parser:
     def _line_count(self) -> int:
         return len(self.lines)
 
-    def _current_line(self) -> str:
-        return self.lines[self.index]
+    def _prescan(self, raw_line: str) -> tuple[int, str, int]:
+        indent = len(raw_line) - len(raw_line.lstrip(" "))
+        tab_column = indent + 1 if raw_line[indent : indent + 1] == "\t" else 0
+        return indent, self._strip_comment(raw_line), tab_column
 
-    def _is_blank_or_comment(self, raw_line: str) -> bool:
-        stripped = self._strip_comment(raw_line).strip()
-        return stripped == ""
+    def _code_at(self, index: int) -> str:
+        return self._pre[index][1]
+
+    def _indent_at(self, index: int) -> int:
+        indent, _, tab_column = self._pre[index]
+        if tab_column:
+            self._raise("Tabs are not supported for indentation", index + 1, tab_column)
+        return indent
 
     def _strip_comment(self, raw_line: str) -> str:
+        if "#" not in raw_line:
+            return raw_line
+        if "'" not in raw_line and '"' not in raw_line:
+            return raw_line[: raw_line.index("#")]
         in_quote: str | None = None
         escaped = False
         for idx, char in enumerate(raw_line):
@@ -412,39 +488,25 @@ class Parser:
                 return raw_line[:idx]
         return raw_line
 
-    def _leading_indent(self, raw_line: str, line_no: int) -> int:
-        if raw_line.startswith("\t"):
-            self._raise("Tabs are not supported for indentation", line_no, 1)
-        indent = 0
-        while indent < len(raw_line):
-            if raw_line[indent] == " ":
-                indent += 1
-                continue
-            if raw_line[indent] == "\t":
-                self._raise("Tabs are not supported for indentation", line_no, indent + 1)
-            break
-        return indent
-
     def _raise(self, message: str, line: int, column: int) -> None:
         source_line = self.lines[line - 1] if 1 <= line <= len(self.lines) else ""
         raise DSLSyntaxError(message, line, column, source_line)
 
     def _parse_block(self, expected_indent: int) -> list[Statement]:
         statements: list[Statement] = []
-        while self.index < self._line_count():
-            raw_line = self._current_line()
+        while True:
+            self.index = self._next_significant[self.index]
+            if self.index >= self._line_count():
+                break
             line_no = self.index + 1
-            if self._is_blank_or_comment(raw_line):
-                self.index += 1
-                continue
 
-            indent = self._leading_indent(raw_line, line_no)
+            indent = self._indent_at(self.index)
             if indent < expected_indent:
                 break
             if indent > expected_indent:
                 self._raise("Unexpected indentation", line_no, indent + 1)
 
-            stripped = self._strip_comment(raw_line).rstrip()[indent:]
+            stripped = self._code_at(self.index).rstrip()[indent:]
             statements.append(self._parse_statement(stripped, line_no, indent))
         return statements
 
@@ -462,7 +524,7 @@ class Parser:
         if assign_index != -1:
             lhs = text[:assign_index].strip()
             rhs = text[assign_index + 1 :].strip()
-            if not _IDENTIFIER_RE.match(lhs):
+            if not _match_identifier(lhs):
                 self._raise(
                     "Invalid assignment target. Only simple variable names are allowed",
                     line_no,
@@ -478,7 +540,7 @@ class Parser:
             rhs_full, consumed = self._collect_continued_expression(rhs, line_no)
             expr = self._parse_expression(rhs_full, line_no, expr_col)
             self.index += consumed
-            return Assign(lhs, expr, SourceLocation(line_no, indent + 1))
+            return Assign(sys.intern(lhs), expr, SourceLocation(line_no, indent + 1))
 
         expr_text, consumed = self._collect_continued_expression(text, line_no)
         expr = self._parse_expression(expr_text, line_no, indent + 1)
@@ -486,8 +548,10 @@ class Parser:
         return ExprStatement(expr, SourceLocation(line_no, indent + 1))
 
     def _collect_continued_expression(self, text: str, line_no: int) -> tuple[str, int]:
-        expression = text
         balance = self._delimiter_balance(text)
+        if balance <= 0:
+            return text, 1
+        parts = [text]
         consumed = 1
 
         while balance > 0:
@@ -495,14 +559,16 @@ class Parser:
             if next_index >= self._line_count():
                 self._raise("Unterminated expression. Missing closing bracket/parenthesis", line_no, 1)
 
-            next_line = self._strip_comment(self.lines[next_index]).strip()
-            expression = f"{expression}\n{next_line}"
+            next_line = self._code_at(next_index).strip()
+            parts.append(next_line)
             balance += self._delimiter_balance(next_line)
             consumed += 1
 
-        return expression, consumed
+        return "\n".join(parts), consumed
 
     def _delimiter_balance(self, text: str) -> int:
+        if "'" not in text and '"' not in text:
+            return text.count("(") + text.count("[") - text.count(")") - text.count("]")
         balance = 0
         in_quote: str | None = None
         escaped = False
@@ -533,7 +599,7 @@ class Parser:
         match = _FOR_RE.match(text)
         if not match:
             self._raise("Invalid for-loop syntax. Use: for item in iterable:", line_no, indent + 1)
-        var_name = match.group(1)
+        var_name = sys.intern(match.group(1))
         iterable_text = match.group(2).strip()
         iterable_col = indent + text.index(iterable_text) + 1
         iterable = self._parse_expression(iterable_text, line_no, iterable_col)
@@ -552,27 +618,25 @@ class Parser:
         body = self._parse_child_block(parent_indent=indent, parent_line=line_no, parent_col=indent + 1)
         branches = [(condition, body)]
         else_body = None
+        match_elif = _ELIF_RE.match
 
         while self.index < self._line_count():
-            scan = self.index
-            while scan < self._line_count() and self._is_blank_or_comment(self.lines[scan]):
-                scan += 1
+            scan = self._next_significant[self.index]
             if scan >= self._line_count():
                 self.index = scan
                 break
 
-            raw_line = self.lines[scan]
             scan_line_no = scan + 1
-            scan_indent = self._leading_indent(raw_line, scan_line_no)
+            scan_indent = self._indent_at(scan)
             if scan_indent != indent:
                 self.index = scan
                 break
 
-            stripped = self._strip_comment(raw_line).rstrip()[scan_indent:]
+            stripped = self._code_at(scan).rstrip()[scan_indent:]
             if stripped.startswith("elif "):
                 if else_body is not None:
                     self._raise("'elif' cannot appear after 'else'", scan_line_no, scan_indent + 1)
-                elif_match = _ELIF_RE.match(stripped)
+                elif_match = match_elif(stripped)
                 if not elif_match:
                     self._raise("Invalid elif syntax. Use: elif condition:", scan_line_no, scan_indent + 1)
                 cond_text = elif_match.group(1).strip()
@@ -604,20 +668,19 @@ class Parser:
         return IfStatement(branches, else_body, SourceLocation(line_no, indent + 1))
 
     def _parse_child_block(self, parent_indent: int, parent_line: int, parent_col: int) -> list[Statement]:
-        scan = self.index
-        while scan < self._line_count() and self._is_blank_or_comment(self.lines[scan]):
-            scan += 1
+        scan = self._next_significant[self.index]
         if scan >= self._line_count():
             self._raise("Expected an indented block", parent_line, parent_col)
-        child_line = self.lines[scan]
         child_line_no = scan + 1
-        child_indent = self._leading_indent(child_line, child_line_no)
+        child_indent = self._indent_at(scan)
         if child_indent <= parent_indent:
             self._raise("Expected an indented block", child_line_no, child_indent + 1)
         self.index = scan
         return self._parse_block(expected_indent=child_indent)
 
     def _find_assignment(self, text: str) -> int:
+        if "=" not in text:
+            return -1
         depth = 0
         in_quote: str | None = None
         escaped = False
@@ -653,12 +716,18 @@ class Parser:
         return -1
 
     def _parse_expression(self, text: str, line_no: int, column: int):
-        lexer = ExpressionLexer(text, base_column=column, line=line_no, source_line=self.lines[line_no - 1])
-        tokens = lexer.tokenize()
+        try:
+            kinds, tokens = _tokenize_cached(text)
+        except DSLSyntaxError:
+            # Lex again with the real position so the error points at this line.
+            lexer = ExpressionLexer(text, base_column=column, line=line_no, source_line=self.lines[line_no - 1])
+            lexer.tokenize()
+            raise
         parser = ExpressionParser(
             tokens=tokens,
             line=line_no,
             source_line=self.lines[line_no - 1],
             base_column=column,
+            kinds=kinds,
         )
         return parser.parse()
@@ -2,29 +2,229 @@ from __future__ import annotations
 
 import os
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from .errors import DSLRuntimeError, DSLTimeoutError
 from .execution_budget import ExecutionBudget
-from .text_utils import normalize_text
+from .text_utils import iter_line_blocks, normalize_text, read_text_file
 
 
-def _compile_regex(pattern: str, ignore_case: bool = False) -> re.Pattern[str]:
+def _compile_regex(pattern: str | re.Pattern[str], ignore_case: bool = False) -> re.Pattern[str]:
+    if isinstance(pattern, re.Pattern):
+        # Already compiled by the analyzer with the matching flags.
+        return pattern
     if not isinstance(pattern, str):
         raise DSLRuntimeError("Regex pattern must be a string")
-    flags = re.IGNORECASE if ignore_case else 0
     try:
-        return re.compile(pattern, flags)
+        return _compile_regex_cached(pattern, bool(ignore_case))
     except re.error as exc:
         raise DSLRuntimeError(f"Invalid regex pattern: {exc}") from exc
 
 
+@lru_cache(maxsize=256)
+def _compile_regex_cached(pattern: str, ignore_case: bool) -> re.Pattern[str]:
+    # re.error propagates uncached; _compile_regex turns it into a DSL error.
+    return re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+
+# Table-of-contents lines: "1.2 Title ..... 7", "1.2 Title 7" and "Title ..... 7".
+# All three forms share one alternation whose branches are tried in that
+# order, exactly as matching three patterns in turn would; the branch that
+# matched is the one owning match.lastgroup.
+_TOC_LINE_RE = re.compile(
+    r"^(?:(?P<dsection>\d+(?:\.\d+)*)\s+(?P<dtitle>.+?)\.{2,}\s*(?P<dpage>\d+)"
+    r"|(?P<section>\d+(?:\.\d+)*)\s+(?P<title>.+?)\s+(?P<page>\d+)"
+    r"|(?P<ttitle>.+?)\.{2,}\s*(?P<tpage>\d+))$"
+)
+
+_REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+
+def _docx_heading_level(style_name: str) -> int | None:
+    """Level of a "Heading <n>" paragraph style, or None for other styles."""
+    name = style_name.strip().lower()
+    if not name.startswith("heading"):
+        return None
+    rest = name[7:]
+    tail = rest.lstrip()
+    if len(tail) == len(rest):
+        return None
+    digits = 0
+    while digits < len(tail) and tail[digits].isdecimal():
+        digits += 1
+    if not digits:
+        return None
+    return max(1, int(tail[:digits]))
+
+
+@lru_cache(maxsize=256)
+def _literal_pattern(regex: re.Pattern[str]) -> str | None:
+    """Return the pattern text when ``regex`` can only match that exact string."""
+    if regex.flags & (re.IGNORECASE | re.VERBOSE):
+        return None
+    pattern = regex.pattern
+    if not pattern or any(char in _REGEX_METACHARACTERS for char in pattern):
+        return None
+    return pattern
+
+
+@lru_cache(maxsize=256)
+def _required_literal(regex: re.Pattern[str]) -> str | None:
+    """Longest literal run every match of ``regex`` must contain, if any.
+
+    Pages without it cannot match, so a substring test can reject them before
+    the regex engine runs. Case-insensitive patterns get no prefilter.
+    """
+    if regex.flags & re.IGNORECASE:
+        return None
+    try:
+        from re import _parser
+
+        items = _parser.parse(regex.pattern, regex.flags)
+    except Exception:
+        return None
+
+    runs: list[str] = []
+    current: list[str] = []
+
+    def collect(sequence) -> None:
+        # Only items that must appear once, in order, extend a run: plain
+        # literals and the contents of groups. Anything else ends the run.
+        for op, value in sequence:
+            if op is _parser.LITERAL:
+                current.append(chr(value))
+            elif op is _parser.SUBPATTERN and not value[1] & re.IGNORECASE:
+                collect(value[3])
+            else:
+                if current:
+                    runs.append("".join(current))
+                    current.clear()
+
+    collect(items)
+    if current:
+        runs.append("".join(current))
+    return max(runs, key=len, default=None)
+
+
+_IO_WORKERS = min(8, os.cpu_count() or 1)
+_io_pool: ThreadPoolExecutor | None = None
+_io_pool_lock = threading.Lock()
+
+
+def _io_executor() -> ThreadPoolExecutor:
+    """Shared pool for overlapping per-file extraction and scanning."""
+    global _io_pool
+    if _io_pool is None:
+        with _io_pool_lock:
+            if _io_pool is None:
+                _io_pool = ThreadPoolExecutor(max_workers=_IO_WORKERS, thread_name_prefix="fdsl-io")
+    return _io_pool
+
+
+def iter_with_prefetched_chunks(files: list[DSLFile]) -> Iterator[DSLFile]:
+    """Iterate files while their content starts loading on a small thread pool.
+
+    Opening and extracting the next few files (PDF parsing, zip/XML reading)
+    overlaps with the caller's work on earlier ones. Only the first chunk is
+    prefetched, so streamed PDFs are not read past what head() needs. Errors
+    raised while prefetching are dropped; the caller's own content access
+    raises them again in order.
+    """
+    pending = [file for file in files if file._chunks_cache is None]
+    if len(pending) < 2:
+        yield from files
+        return
+    pool = _io_executor()
+    window = 2 * _IO_WORKERS
+    upcoming = iter(pending)
+    futures: dict[int, Future] = {}
+    try:
+        for file in files:
+            while len(futures) < window:
+                next_file = next(upcoming, None)
+                if next_file is None:
+                    break
+                futures[id(next_file)] = pool.submit(_prefetch_first_chunk, next_file)
+            future = futures.pop(id(file), None)
+            if future is not None:
+                try:
+                    future.result()
+                except Exception:
+                    pass
+            yield file
+    finally:
+        for future in futures.values():
+            future.cancel()
+
+
+def _prefetch_first_chunk(file: DSLFile) -> None:
+    next(file._iter_chunks(), None)
+
+
+# Fully extracted and normalized chunks, keyed by (path, mtime_ns, size,
+# text chunk lines). Directory walks build fresh DSLFile objects, so repeated
+# searches would otherwise re-read and re-extract every file.
+_FILE_CHUNKS_CACHE_SIZE = 64
+_file_chunks_cache: dict[tuple[str, int, int, int], tuple[str, ...]] = {}
+_file_chunks_cache_lock = threading.Lock()
+
+
+def _file_cache_key(path: Path, text_chunk_lines: int) -> tuple[str, int, int, int] | None:
+    try:
+        stats = path.stat()
+    except OSError:
+        return None
+    return (os.fspath(path), stats.st_mtime_ns, stats.st_size, text_chunk_lines)
+
+
+def _cached_file_chunks(key: tuple[str, int, int, int] | None) -> tuple[str, ...] | None:
+    if key is None:
+        return None
+    with _file_chunks_cache_lock:
+        chunks = _file_chunks_cache.pop(key, None)
+        if chunks is not None:
+            _file_chunks_cache[key] = chunks
+        return chunks
+
+
+def _remember_file_chunks(key: tuple[str, int, int, int] | None, chunks: list[str]) -> None:
+    if key is None:
+        return
+    with _file_chunks_cache_lock:
+        _file_chunks_cache.pop(key, None)
+        if len(_file_chunks_cache) >= _FILE_CHUNKS_CACHE_SIZE:
+            _file_chunks_cache.pop(next(iter(_file_chunks_cache)))
+        _file_chunks_cache[key] = tuple(chunks)
+
+
+def _resolve_root(root: Path | None) -> Path:
+    # Every file of a directory walk shares its parent's display root, so
+    # resolving it is memoized. Relative roots depend on the cwd and are not.
+    if root is None:
+        root = Path.cwd()
+    if not root.is_absolute():
+        return root.resolve()
+    return _resolve_absolute_root(root)
+
+
+@lru_cache(maxsize=32)
+def _resolve_absolute_root(root: Path) -> Path:
+    return root.resolve()
+
+
 def _render_relative_path(path: Path, cwd: Path) -> str:
+    # cwd is an already-resolved display root. Absolute paths are rendered
+    # lexically so listing a directory does not stat every path component.
+    target = os.fspath(path if path.is_absolute() else path.resolve())
     try:
-        return Path(os.path.relpath(path.resolve(), cwd.resolve())).as_posix()
+        return os.path.relpath(target, cwd).replace(os.sep, "/")
     except ValueError:
-        return path.resolve().as_posix()
+        return Path(target).as_posix()
 
 
 class DSLFile:
@@ -36,11 +236,20 @@ class DSLFile:
         budget: ExecutionBudget | None = None,
     ) -> None:
         self.path = path
+        self._suffix = path.suffix.lower()
         self._text_chunk_lines = text_chunk_lines
-        self.display_root = (display_root or Path.cwd()).resolve()
+        self.display_root = _resolve_root(display_root)
         self.budget = budget
         self._chunks_cache: list[str] | None = None
         self._chunks_loaded_from_db = False
+        # PDF pages are extracted on demand: _streamed_chunks holds the pages
+        # read so far and _chunk_stream yields the rest until it is exhausted.
+        self._chunk_stream: Iterator[str] | None = None
+        self._streamed_chunks: list[str] = []
+        self._source_cache_key: tuple[str, int, int, int] | None = None
+        self._page_hits: dict[re.Pattern[str], tuple[int, ...]] = {}
+        self._full_text_cache: str | None = None
+        self._display_path_cache: str | None = None
 
     def __repr__(self) -> str:
         return f"File('{self._display_path()}')"
@@ -54,8 +263,11 @@ class DSLFile:
         return item in self.path.name
 
     def _display_path(self, path: Path | None = None) -> str:
-        target = path if path is not None else self.path
-        return _render_relative_path(target, self.display_root)
+        if path is not None:
+            return _render_relative_path(path, self.display_root)
+        if self._display_path_cache is None:
+            self._display_path_cache = _render_relative_path(self.path, self.display_root)
+        return self._display_path_cache
 
     def _check_budget(self, phase: str) -> None:
         if self.budget is None:
@@ -83,22 +295,58 @@ class DSLFile:
     def search(self, pattern: str, ignore_case: bool = False) -> list[int]:
         self._check_budget("file.search")
         regex = _compile_regex(pattern, ignore_case=ignore_case)
+        return list(self._matching_pages(regex))
+
+    def _matching_pages(self, regex: re.Pattern[str], limit: int | None = None) -> tuple[int, ...]:
+        # contains/search/snippets on the same file usually share patterns, so
+        # each pattern scans the file's pages at most once. A limited scan
+        # stops early and is not remembered, since it may have missed pages.
+        cached = self._page_hits.get(regex)
+        if cached is not None:
+            return cached if limit is None else cached[:limit]
+        literal = _literal_pattern(regex)
+        required = _required_literal(regex) if literal is None else None
         matches = []
-        for page_index, chunk in enumerate(self._chunks(), start=1):
+        for page_index, chunk in enumerate(self._iter_chunks(), start=1):
             self._check_budget("file.search.chunk")
-            if regex.search(chunk):
-                matches.append(page_index)
-        return matches
-
-    def contains(self, pattern: str, ignore_case: bool = False) -> bool:
-        return bool(self.search(pattern, ignore_case=ignore_case))
+            if literal is not None:
+                if literal not in chunk:
+                    continue
+            elif (required is not None and required not in chunk) or not regex.search(chunk):
+                continue
+            matches.append(page_index)
+            if limit is not None and len(matches) >= limit:
+                return tuple(matches)
+        hits = tuple(matches)
+        self._page_hits[regex] = hits
+        return hits
+
+    def contains(self, pattern: str | re.Pattern[str], ignore_case: bool = False) -> bool:
+        self._check_budget("file.search")
+        regex = _compile_regex(pattern, ignore_case=ignore_case)
+        literal = _literal_pattern(regex)
+        if (
+            literal is not None
+            and "\n" not in literal
+            and regex not in self._page_hits
+            and self._chunks_loaded()
+        ):
+            # A single-line literal cannot straddle the page separator, so one
+            # substring test over the joined text answers for every page.
+            # Streamed PDFs scan page by page instead and stop at the first hit.
+            return literal in self._full_text()
+        return bool(self._matching_pages(regex, limit=1))
+
+    def _full_text(self) -> str:
+        if self._full_text_cache is None:
+            chunks = self._chunks()
+            self._check_budget("file.search.chunk")
+            self._full_text_cache = "\n\n".join(chunks)
+        return self._full_text_cache
 
     def head(self):
         self._check_budget("file.head")
-        chunks = self._chunks()
-        if not chunks:
-            return ""
-        return chunks[0]
+        return next(self._iter_chunks(), "")
 
     def tail(self):
         self._check_budget("file.tail")
@@ -113,14 +361,9 @@ class DSLFile:
             raise DSLRuntimeError("max_items must be a positive integer")
 
         entries: list[tuple[int, str, int | None]] = []
-        suffix = self.path.suffix.lower()
-        if self.path.exists():
-            if suffix == ".pdf":
-                entries = self._read_pdf_outline(max_items=max_items)
-            elif suffix == ".docx":
-                entries = self._read_docx_outline(max_items=max_items)
-            elif suffix == ".pptx":
-                entries = self._read_pptx_outline(max_items=max_items)
+        read_outline = _OUTLINE_READERS.get(self._suffix)
+        if read_outline is not None and self.path.exists():
+            entries = read_outline(self, max_items=max_items)
         if not entries:
             entries = self._extract_toc_entries_from_text(max_items=max_items)
         if not entries:
@@ -163,10 +406,12 @@ class DSLFile:
         if not isinstance(context_chars, int) or context_chars < 0:
             raise DSLRuntimeError("context_chars must be a non-negative integer")
         regex = _compile_regex(pattern, ignore_case=ignore_case)
+        chunks = self._chunks()
 
         snippets: list[str] = []
-        for page_index, chunk in enumerate(self._chunks(), start=1):
+        for page_index in self._matching_pages(regex):
             self._check_budget("file.snippets.chunk")
+            chunk = chunks[page_index - 1]
             for match in regex.finditer(chunk):
                 start = max(match.start() - context_chars, 0)
                 end = min(match.end() + context_chars, len(chunk))
@@ -186,15 +431,17 @@ class DSLFile:
             raise DSLRuntimeError("pages must be an integer or a list of integers")
 
         normalized: list[int] = []
+        seen: set[int] = set()
         for value in pages_values:
             self._check_budget("file.normalize_pages.item")
             if not isinstance(value, int):
                 raise DSLRuntimeError("pages list must contain only integers")
-            if value < 1 or value > total_pages:
+            if not 1 <= value <= total_pages:
                 raise DSLRuntimeError(
                     f"Page {value} is out of range for {self.path.name} (1..{total_pages})"
                 )
-            if value not in normalized:
+            if value not in seen:
+                seen.add(value)
                 normalized.append(value)
         return normalized
 
@@ -204,8 +451,33 @@ class DSLFile:
 
     def _chunks(self) -> list[str]:
         self._check_budget("file.chunks")
+        if self._chunks_cache is None:
+            if not self._chunks_loaded():
+                while self._chunks_cache is None:
+                    self._pull_streamed_chunk()
+        return self._chunks_cache
+
+    def _iter_chunks(self) -> Iterator[str]:
+        """Yield normalized chunks, extracting PDF pages only as they are reached."""
+        self._check_budget("file.chunks")
+        self._chunks_loaded()
+        index = 0
+        while True:
+            chunks = self._chunks_cache if self._chunks_cache is not None else self._streamed_chunks
+            if index < len(chunks):
+                yield chunks[index]
+                index += 1
+            elif self._chunks_cache is not None:
+                return
+            else:
+                self._pull_streamed_chunk()
+
+    def _chunks_loaded(self) -> bool:
+        """Open the chunk source if needed; True once every chunk is in memory."""
         if self._chunks_cache is not None:
-            return self._chunks_cache
+            return True
+        if self._chunk_stream is not None:
+            return False
 
         from .semantic import get_file_pages_from_database
 
@@ -218,23 +490,46 @@ class DSLFile:
             self._chunks_loaded_from_db = True
             chunks = db_chunks
         else:
-            suffix = self.path.suffix.lower()
-            if suffix == ".pdf":
-                chunks = self._read_pdf_pages()
-            elif suffix == ".docx":
-                chunks = self._read_docx_chunks()
-            elif suffix == ".pptx":
-                chunks = self._read_pptx_chunks()
-            else:
-                chunks = self._read_text_chunks()
+            # The key is taken before reading, so a file changed mid-read is
+            # cached under its old identity and missed on the next lookup.
+            self._source_cache_key = _file_cache_key(self.path, self._text_chunk_lines)
+            cached_chunks = _cached_file_chunks(self._source_cache_key)
+            if cached_chunks is not None:
+                self._chunks_cache = list(cached_chunks)
+                return True
+            if self._suffix == ".pdf":
+                self._streamed_chunks = []
+                self._chunk_stream = self._iter_pdf_pages()
+                return False
+            chunks = _CHUNK_READERS.get(self._suffix, DSLFile._read_text_chunks)(self)
         normalized_chunks: list[str] = []
         for chunk in chunks:
             self._check_budget("file.chunks.normalize")
             normalized_chunks.append(normalize_text(chunk))
         self._chunks_cache = normalized_chunks or [""]
-        return self._chunks_cache
+        if not self._chunks_loaded_from_db:
+            _remember_file_chunks(self._source_cache_key, self._chunks_cache)
+        return True
 
-    def _read_pdf_pages(self) -> list[str]:
+    def _pull_streamed_chunk(self) -> None:
+        assert self._chunk_stream is not None
+        try:
+            chunk = next(self._chunk_stream)
+        except StopIteration:
+            self._chunk_stream = None
+            self._chunks_cache = self._streamed_chunks or [""]
+            self._streamed_chunks = []
+            _remember_file_chunks(self._source_cache_key, self._chunks_cache)
+            return
+        except BaseException:
+            # A failed stream cannot be resumed; the next access starts over.
+            self._chunk_stream = None
+            self._streamed_chunks = []
+            raise
+        self._check_budget("file.chunks.normalize")
+        self._streamed_chunks.append(normalize_text(chunk))
+
+    def _iter_pdf_pages(self) -> Iterator[str]:
         self._check_budget("file.read_pdf")
         try:
             import pymupdf
@@ -243,18 +538,31 @@ class DSLFile:
                 "PyMuPDF is required to read PDF files. Install dependency 'pymupdf'."
             ) from exc
 
-        try:
-            with pymupdf.open(str(self.path)) as doc:
-                pages: list[str] = []
-                for page in doc:
-                    self._check_budget("file.read_pdf.page")
-                    pages.append(page.get_text("text").strip())
-        except DSLTimeoutError:
-            raise
-        except Exception as exc:
-            raise DSLRuntimeError(f"Failed to read PDF '{self.path.name}': {exc}") from exc
-
-        return pages or [""]
+        # Ligatures are expanded by MuPDF directly; normalize_text would
+        # otherwise do it through the slower NFKC path.
+        flags = pymupdf.TEXTFLAGS_TEXT & ~pymupdf.TEXT_PRESERVE_LIGATURES
+        # The document is closed before every yield, so a paused stream holds
+        # no file handle. Pages are read in doubling batches: a full read
+        # reopens the file only O(log pages) times.
+        next_page = 0
+        batch_size = 1
+        while True:
+            try:
+                with pymupdf.open(str(self.path)) as doc:
+                    page_count = doc.page_count
+                    texts: list[str] = []
+                    for page_number in range(next_page, min(next_page + batch_size, page_count)):
+                        self._check_budget("file.read_pdf.page")
+                        texts.append(doc.load_page(page_number).get_text("text", flags=flags).strip())
+            except DSLTimeoutError:
+                raise
+            except Exception as exc:
+                raise DSLRuntimeError(f"Failed to read PDF '{self.path.name}': {exc}") from exc
+            yield from texts
+            next_page += len(texts)
+            if next_page >= page_count:
+                return
+            batch_size *= 2
 
     def _read_pdf_outline(self, max_items: int) -> list[tuple[int, str, int | None]]:
         self._check_budget("file.read_pdf_outline")
@@ -334,12 +642,18 @@ class DSLFile:
                 continue
             current_lines.append(text)
 
-        for table in doc.tables:
+        # doc.tables rebuilds its list on every access, so read it once.
+        tables = doc.tables
+        for table in tables:
             self._check_budget("file.read_docx.table")
             rows: list[str] = []
             for row in table.rows:
                 self._check_budget("file.read_docx.table_row")
-                cells = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+                cells: list[str] = []
+                for cell in row.cells:
+                    cell_text = cell.text.strip()
+                    if cell_text:
+                        cells.append(cell_text)
                 if cells:
                     rows.append(" | ".join(cells))
             if rows:
@@ -370,10 +684,9 @@ class DSLFile:
             if not text:
                 continue
             style_name = (para.style.name if para.style else "") or ""
-            match = re.match(r"heading\s+(\d+)", style_name.strip().lower())
-            if not match:
+            level = _docx_heading_level(style_name)
+            if level is None:
                 continue
-            level = max(1, int(match.group(1)))
             entries.append((level, text, None))
             if len(entries) >= max_items:
                 break
@@ -399,18 +712,16 @@ class DSLFile:
             lines: list[str] = []
             for shape in slide.shapes:
                 self._check_budget("file.read_pptx.shape")
-                if not hasattr(shape, "has_text_frame") or not shape.has_text_frame:
+                if not getattr(shape, "has_text_frame", False):
                     continue
                 text = shape.text.strip()
                 if not text:
                     continue
-                for line in text.splitlines():
-                    stripped = line.strip()
-                    if stripped:
-                        lines.append(stripped)
+                lines.extend(stripped for line in text.splitlines() if (stripped := line.strip()))
 
-            if slide.has_notes_slide and slide.notes_slide.notes_text_frame:
-                notes_text = slide.notes_slide.notes_text_frame.text.strip()
+            notes_frame = slide.notes_slide.notes_text_frame if slide.has_notes_slide else None
+            if notes_frame:
+                notes_text = notes_frame.text.strip()
                 if notes_text:
                     lines.append("[Notes]")
                     for line in notes_text.splitlines():
@@ -442,12 +753,14 @@ class DSLFile:
         for index, slide in enumerate(presentation.slides, start=1):
             self._check_budget("file.read_pptx_outline.slide")
             title = ""
-            if slide.shapes.title and slide.shapes.title.text:
-                title = slide.shapes.title.text.strip()
+            # shapes.title searches the slide's placeholders on every access.
+            title_shape = slide.shapes.title
+            if title_shape and title_shape.text:
+                title = title_shape.text.strip()
             if not title:
                 for shape in slide.shapes:
                     self._check_budget("file.read_pptx_outline.shape")
-                    if not hasattr(shape, "has_text_frame") or not shape.has_text_frame:
+                    if not getattr(shape, "has_text_frame", False):
                         continue
                     text = shape.text.strip()
                     if text:
@@ -463,36 +776,37 @@ class DSLFile:
 
     def _extract_toc_entries_from_text(self, max_items: int) -> list[tuple[int, str, int | None]]:
         self._check_budget("file.extract_toc")
-        numbered_dotted = re.compile(r"^(\d+(?:\.\d+)*)\s+(.+?)\.{2,}\s*(\d+)$")
-        numbered_plain = re.compile(r"^(\d+(?:\.\d+)*)\s+(.+?)\s+(\d+)$")
-        titled_dotted = re.compile(r"^(.+?)\.{2,}\s*(\d+)$")
         entries: list[tuple[int, str, int | None]] = []
         seen: set[tuple[int, str, int | None]] = set()
 
-        for chunk in self._chunks()[:8]:
+        for chunk in islice(self._iter_chunks(), 8):
             self._check_budget("file.extract_toc.chunk")
             for raw_line in chunk.splitlines():
                 self._check_budget("file.extract_toc.line")
                 line = raw_line.strip()
-                if len(line) < 8:
+                # Every TOC pattern ends in a page number; most prose does not.
+                if len(line) < 8 or not line[-1].isdecimal():
                     continue
 
                 level = 1
                 title = ""
                 page: int | None = None
 
-                match = numbered_dotted.match(line) or numbered_plain.match(line)
-                if match:
-                    section = match.group(1).strip()
-                    body = match.group(2).strip()
-                    title = f"{section} {body}".strip()
-                    page = int(match.group(3))
-                    level = section.count(".") + 1
+                match = _TOC_LINE_RE.match(line)
+                if match is None:
+                    continue
+                if match.lastgroup == "tpage":
+                    title = match.group("ttitle").strip()
+                    page = int(match.group("tpage"))
                 else:
-                    title_match = titled_dotted.match(line)
-                    if title_match:
-                        title = title_match.group(1).strip()
-                        page = int(title_match.group(2))
+                    if match.lastgroup == "dpage":
+                        section, body, page_text = match.group("dsection", "dtitle", "dpage")
+                    else:
+                        section, body, page_text = match.group("section", "title", "page")
+                    section = section.strip()
+                    title = f"{section} {body.strip()}".strip()
+                    page = int(page_text)
+                    level = section.count(".") + 1
 
                 if not title:
                     continue
@@ -507,34 +821,41 @@ class DSLFile:
 
     def _format_toc_tree(self, entries: list[tuple[int, str, int | None]]) -> str:
         lines: list[str] = []
+        indents: dict[int, str] = {}
         for level, title, page in entries:
-            indent = "  " * max(level - 1, 0)
+            indent = indents.get(level)
+            if indent is None:
+                indent = indents[level] = "  " * max(level - 1, 0)
             page_text = f" (p.{page})" if page is not None else ""
             lines.append(f"{indent}{title}{page_text}")
         return "\n".join(lines)
 
     def _read_text_chunks(self) -> list[str]:
         self._check_budget("file.read_text")
-        try:
-            text = self.path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            text = self.path.read_text(encoding="utf-8", errors="replace")
+        text = read_text_file(self.path)
 
         if text == "":
             return [""]
 
-        lines = text.splitlines()
-        if not lines:
-            return [text]
-
         chunks: list[str] = []
-        for start in range(0, len(lines), self._text_chunk_lines):
+        for block in iter_line_blocks(text, self._text_chunk_lines):
             self._check_budget("file.read_text.chunk")
-            block = "\n".join(lines[start : start + self._text_chunk_lines]).strip()
-            chunks.append(block)
+            chunks.append(block.strip())
         return chunks or [text]
 
 
+# PDFs are not listed in _CHUNK_READERS: their pages are streamed instead.
+_CHUNK_READERS = {
+    ".docx": DSLFile._read_docx_chunks,
+    ".pptx": DSLFile._read_pptx_chunks,
+}
+_OUTLINE_READERS = {
+    ".pdf": DSLFile._read_pdf_outline,
+    ".docx": DSLFile._read_docx_outline,
+    ".pptx": DSLFile._read_pptx_outline,
+}
+
+
 class DSLDirectory:
     def __init__(
         self,
@@ -543,7 +864,7 @@ class DSLDirectory:
         display_root: Path | None = None,
         budget: ExecutionBudget | None = None,
     ) -> None:
-        self.display_root = (display_root or Path.cwd()).resolve()
+        self.display_root = _resolve_root(display_root)
         self.budget = budget
         if path.exists():
             if not path.is_dir():
@@ -552,6 +873,10 @@ class DSLDirectory:
             raise DSLRuntimeError(f"Directory does not exist: {self._display_path(path)}")
         self.path = path
         self.recursive = recursive
+        # Walked and indexed paths are built from self.path, so a plain string
+        # prefix test stands in for Path.relative_to().
+        prefix = os.fspath(path)
+        self._path_prefix = prefix if prefix.endswith(os.sep) else prefix + os.sep
 
     def __repr__(self) -> str:
         return f"Directory('{self._display_path()}')"
@@ -615,37 +940,38 @@ class DSLDirectory:
         emitted = 1
         truncated = False
 
-        def walk(current: Path, depth: int) -> bool:
+        def walk(current: str, depth: int) -> bool:
             nonlocal emitted, truncated
             self._check_budget("directory.tree.walk")
             if depth >= max_depth:
                 return True
+            indent = "  " * (depth + 1)
 
             try:
-                entries = sorted(
-                    list(current.iterdir()),
-                    key=lambda p: (not p.is_dir(), p.name.lower()),
-                )
+                with os.scandir(current) as it:
+                    entries = sorted(
+                        ((not entry.is_dir(), entry.name.lower(), entry.name, entry.path) for entry in it),
+                    )
             except OSError as exc:
-                lines.append(f"{'  ' * (depth + 1)}[unreadable: {exc}]")
+                lines.append(f"{indent}[unreadable: {exc}]")
                 emitted += 1
                 return emitted < max_entries
 
-            for entry in entries:
+            for is_file, _, name, entry_path in entries:
                 self._check_budget("directory.tree.entry")
                 if emitted >= max_entries:
                     truncated = True
                     return False
-                label = f"{entry.name}/" if entry.is_dir() else entry.name
-                lines.append(f"{'  ' * (depth + 1)}{label}")
+                label = name if is_file else f"{name}/"
+                lines.append(indent + label)
                 emitted += 1
-                if entry.is_dir():
-                    keep_going = walk(entry, depth + 1)
+                if not is_file:
+                    keep_going = walk(entry_path, depth + 1)
                     if not keep_going:
                         return False
             return True
 
-        walk(self.path, 0)
+        walk(os.fspath(self.path), 0)
         if truncated:
             lines.append(f"... truncated after {max_entries} entries")
         return "\n".join(lines)
@@ -663,17 +989,16 @@ class DSLDirectory:
             "files": set(),
         }
 
+        prefix = self._path_prefix
         for path in paths:
             self._check_budget("directory.render_tree.path")
-            try:
-                relative_path = path.relative_to(self.path)
-            except ValueError:
-                continue
-            if not relative_path.parts:
+            path_str = os.fspath(path)
+            if not path_str.startswith(prefix) or len(path_str) == len(prefix):
                 continue
+            parts = path_str[len(prefix) :].split(os.sep)
 
             node = root
-            for part in relative_path.parts[:-1]:
+            for part in parts[:-1]:
                 dirs = node["dirs"]
                 if not isinstance(dirs, dict):
                     break
@@ -681,7 +1006,7 @@ class DSLDirectory:
             else:
                 files = node["files"]
                 if isinstance(files, set):
-                    files.add(relative_path.parts[-1])
+                    files.add(parts[-1])
 
         lines: list[str] = [f"{self._display_path()}/"]
         emitted = 1
@@ -697,6 +1022,7 @@ class DSLDirectory:
             files = node["files"]
             if not isinstance(dirs, dict) or not isinstance(files, set):
                 return True
+            indent = "  " * (depth + 1)
 
             dir_items = sorted(dirs.items(), key=lambda item: item[0].lower())
             file_items = sorted(files, key=lambda item: item.lower())
@@ -706,7 +1032,7 @@ class DSLDirectory:
                 if emitted >= max_entries:
                     truncated = True
                     return False
-                lines.append(f"{'  ' * (depth + 1)}{name}/")
+                lines.append(f"{indent}{name}/")
                 emitted += 1
                 if isinstance(child, dict):
                     if not walk(child, depth + 1):
@@ -717,7 +1043,7 @@ class DSLDirectory:
                 if emitted >= max_entries:
                     truncated = True
                     return False
-                lines.append(f"{'  ' * (depth + 1)}{name}")
+                lines.append(indent + name)
                 emitted += 1
             return True
 
@@ -733,6 +1059,7 @@ class DSLDirectory:
         in_content: bool = False,
         recursive: bool | None = None,
         ignore_case: bool = False,
+        max_results: int | None = None,
     ) -> list[DSLFile]:
         self._check_budget("directory.search")
         if recursive is None:
@@ -741,28 +1068,84 @@ class DSLDirectory:
             scope = "content"
         if scope not in {"name", "content", "both"}:
             raise DSLRuntimeError("scope must be one of: 'name', 'content', 'both'")
+        if max_results is not None and (not isinstance(max_results, int) or max_results < 1):
+            raise DSLRuntimeError("max_results must be a positive integer")
 
         regex = _compile_regex(pattern, ignore_case=ignore_case)
-        files = [
-            DSLFile(path, display_root=self.display_root, budget=self.budget)
-            for path in self._iter_file_paths(recursive)
-        ]
+        required = _required_literal(regex)
+        prefix = self._path_prefix
+        # With max_results, candidates are resolved a window at a time so the
+        # walk and the content checks stop once enough files have matched.
+        window = None if max_results is None else max(max_results, 2 * _IO_WORKERS)
         matches: list[DSLFile] = []
-        for file in files:
+        # (file, matched by name); files not matched by name need a content check.
+        candidates: list[tuple[DSLFile, bool]] = []
+        for path in self._stream_file_paths(recursive):
             self._check_budget("directory.search.file")
-            relative = file.path.relative_to(self.path).as_posix()
-            name_match = bool(regex.search(file.path.name) or regex.search(relative))
-            content_match = False
-            if scope in {"content", "both"}:
-                content_match = file.contains(pattern, ignore_case=ignore_case)
-
-            if scope == "name" and name_match:
-                matches.append(file)
-            elif scope == "content" and content_match:
-                matches.append(file)
-            elif scope == "both" and (name_match or content_match):
-                matches.append(file)
-        return matches
+            if scope != "content":
+                path_str = os.fspath(path)
+                if path_str.startswith(prefix):
+                    relative = path_str[len(prefix) :].replace(os.sep, "/")
+                else:
+                    relative = path.relative_to(self.path).as_posix()
+                # The name is a suffix of the relative path, so a literal the
+                # pattern requires must occur in the latter for either to match.
+                if (required is None or required in relative) and (
+                    regex.search(path.name) or regex.search(relative)
+                ):
+                    # Name matches never need the file's content.
+                    candidates.append((DSLFile(path, display_root=self.display_root, budget=self.budget), True))
+                elif scope != "name":
+                    candidates.append((DSLFile(path, display_root=self.display_root, budget=self.budget), False))
+            else:
+                candidates.append((DSLFile(path, display_root=self.display_root, budget=self.budget), False))
+
+            if window is not None and len(candidates) >= window:
+                matches.extend(self._resolve_candidates(candidates, regex, ignore_case))
+                candidates = []
+                if len(matches) >= max_results:
+                    return matches[:max_results]
+
+        matches.extend(self._resolve_candidates(candidates, regex, ignore_case))
+        return matches if max_results is None else matches[:max_results]
+
+    def _resolve_candidates(
+        self,
+        candidates: list[tuple[DSLFile, bool]],
+        regex: re.Pattern[str],
+        ignore_case: bool,
+    ) -> list[DSLFile]:
+        content_hits = iter(
+            self._contains_each(
+                [file for file, named in candidates if not named],
+                regex,
+                ignore_case,
+            )
+        )
+        return [file for file, named in candidates if named or next(content_hits)]
+
+    def _contains_each(self, files: list[DSLFile], regex: re.Pattern[str], ignore_case: bool) -> list[bool]:
+        # Content checks are independent per file and dominated by extraction,
+        # so they run on the shared I/O pool; results keep directory order.
+        # Passing the compiled regex spares each file its own compile lookup.
+        if len(files) < 2:
+            results = []
+            for file in files:
+                self._check_budget("directory.search.file")
+                results.append(file.contains(regex, ignore_case=ignore_case))
+            return results
+
+        pool = _io_executor()
+        futures = [pool.submit(file.contains, regex, ignore_case=ignore_case) for file in files]
+        try:
+            results = []
+            for future in futures:
+                self._check_budget("directory.search.file")
+                results.append(future.result())
+            return results
+        finally:
+            for future in futures:
+                future.cancel()
 
     def semantic_search(
         self,
@@ -799,6 +1182,9 @@ class DSLDirectory:
         return results
 
     def _iter_file_paths(self, recursive: bool) -> list[Path]:
+        return list(self._stream_file_paths(recursive))
+
+    def _stream_file_paths(self, recursive: bool) -> Iterator[Path]:
         self._check_budget("directory.iter_paths")
         from .semantic import get_directory_file_paths_from_database
 
@@ -809,22 +1195,43 @@ class DSLDirectory:
             budget=self.budget,
         )
         if db_paths is not None:
-            return db_paths
-
-        if recursive:
-            paths: list[Path] = []
-            for path in self.path.rglob("*"):
-                self._check_budget("directory.iter_paths.recursive")
-                if path.is_file():
-                    paths.append(path)
-        else:
-            paths = []
-            for path in self.path.glob("*"):
-                self._check_budget("directory.iter_paths.flat")
-                if path.is_file():
-                    paths.append(path)
-        paths.sort(key=lambda p: p.as_posix())
-        return paths
+            yield from db_paths
+            return
+
+        # Paths come out in plain string order of their "/"-joined form, one
+        # directory listing at a time: a file and a subtree compare exactly as
+        # the file name and the directory name plus "/" do, so sorting each
+        # listing by that key and descending depth-first needs no global sort.
+        phase = "directory.iter_paths.recursive" if recursive else "directory.iter_paths.flat"
+        stack = [iter(self._sorted_listing(os.fspath(self.path), recursive, phase))]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            _, path, is_dir = item
+            if is_dir:
+                stack.append(iter(self._sorted_listing(path, recursive, phase)))
+            else:
+                yield Path(path)
+
+    def _sorted_listing(self, directory: str, recursive: bool, phase: str) -> list[tuple[str, str, bool]]:
+        # os.scandir entries carry their file type, so unlike rglob + is_file()
+        # this needs no extra stat per entry. Like rglob, symlinked files are
+        # listed but symlinked directories are not descended into.
+        listing: list[tuple[str, str, bool]] = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    self._check_budget(phase)
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        listing.append((entry.name + "/", entry.path, True))
+                    elif entry.is_file():
+                        listing.append((entry.name, entry.path, False))
+        except OSError:
+            pass
+        listing.sort()
+        return listing
 
     def _has_db_backed_files(self, path: Path) -> bool:
         from .semantic import get_directory_file_paths_from_database
@@ -3,10 +3,15 @@ from __future__ import annotations
 import hashlib
 import io
 import json
-import math
+import multiprocessing
 import os
 import re
+import threading
 import zipfile
+import zlib
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
@@ -14,16 +19,44 @@ import xml.etree.ElementTree as ET
 
 from .errors import DSLRuntimeError, DSLTimeoutError
 from .execution_budget import ExecutionBudget
-from .text_utils import normalize_text
+from .text_utils import iter_line_blocks, normalize_text, read_text_file
 
 
 SEMANTIC_DB_DIRNAME = ".fdsl_faiss"
 SEMANTIC_INDEX_FILENAME = "pages.faiss"
 SEMANTIC_RECORDS_FILENAME = "records.json"
-SEMANTIC_VECTORS_FILENAME = "vectors.json"
+SEMANTIC_VECTORS_FILENAME = "vectors.npy"
+LEGACY_VECTORS_FILENAME = "vectors.json"
 SEMANTIC_META_FILENAME = "meta.json"
+SEMANTIC_SOURCES_FILENAME = "sources.json"
+# Bump when extraction or text cleanup changes, so re-prepare stops reusing
+# pages stored by earlier versions.
+EXTRACTION_VERSION = 1
 EMBEDDING_DIM = 256
-EMBEDDING_VERSION = "stable_hash_v1"
+# EMBEDDING_DIM is a power of two, so bucketing can mask instead of divide.
+_EMBEDDING_MASK = EMBEDDING_DIM - 1
+_TOKEN_RE = re.compile(r"\w+")
+_ENCODE_BATCH_SIZE = 1024
+EMBEDDING_VERSION = "stable_crc32_v2"
+QUERY_VECTOR_CACHE_SIZE = 4096
+FILE_PAGES_CACHE_SIZE = 4096
+TOKEN_BUCKET_CACHE_SIZE = 65536
+# Document formats whose extraction is CPU-bound enough to be worth a worker
+# process during prepare; plain text is read in-process.
+_PROCESS_EXTRACT_SUFFIXES = frozenset({".pdf", ".docx", ".pptx"})
+_PREPARE_WORKERS = min(8, os.cpu_count() or 1)
+
+_query_vector_cache: dict[str, tuple[float, ...]] = {}
+# Absolute file path -> (records cache key, pages); pages is None when the
+# index does not cover the file. See get_file_pages_from_database.
+_file_pages_cache: dict[str, tuple[tuple[str, int, int], tuple[str, ...] | None]] = {}
+_file_pages_cache_lock = threading.Lock()
+
+
+def clear_database_lookup_cache() -> None:
+    """Forget per-file index lookups, e.g. after an index was (re)built."""
+    with _file_pages_cache_lock:
+        _file_pages_cache.clear()
 
 
 def _check_budget(budget: ExecutionBudget | None, phase: str) -> None:
@@ -32,6 +65,18 @@ def _check_budget(budget: ExecutionBudget | None, phase: str) -> None:
     budget.check(phase)
 
 
+@dataclass(frozen=True)
+class _RecordColumns:
+    """Index records stored column by column; row ``i`` matches vector row ``i``."""
+
+    relative_paths: tuple[str | None, ...]
+    pages: tuple[int | None, ...]
+    texts: tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+
 @dataclass(frozen=True)
 class PrepareStats:
     folder: Path
@@ -44,7 +89,14 @@ def prepare_semantic_database(
     folder: Path,
     *,
     budget: ExecutionBudget | None = None,
+    workers: int = 1,
 ) -> PrepareStats:
+    """Index ``folder`` into its ``.fdsl_faiss`` database.
+
+    ``workers`` > 1 extracts PDF/DOCX/PPTX files in spawned worker processes,
+    which re-import ``__main__``: only pass it from a guarded entry point.
+    """
+    clear_database_lookup_cache()
     target_folder = folder.resolve()
     if not target_folder.exists():
         raise DSLRuntimeError(f"Folder does not exist: {target_folder.as_posix()}")
@@ -54,34 +106,71 @@ def prepare_semantic_database(
     db_path = target_folder / SEMANTIC_DB_DIRNAME
     db_path.mkdir(parents=True, exist_ok=True)
 
-    records: list[dict[str, str | int]] = []
+    relative_paths: list[str] = []
+    file_names: list[str] = []
+    page_numbers: list[int] = []
+    texts: list[str] = []
     embedding_inputs: list[str] = []
 
     indexed_files = 0
     indexed_pages = 0
-    for file_path in _iter_document_paths(target_folder, budget=budget):
+    file_paths = list(_iter_document_paths(target_folder, budget=budget))
+    relative_file_paths = [file_path.relative_to(target_folder).as_posix() for file_path in file_paths]
+
+    # Files whose content is unchanged since the last prepare reuse the
+    # cleaned pages already stored in the index instead of being extracted.
+    previous = _load_previous_extractions(db_path)
+    sources: dict[str, list[int | str]] = {}
+    reused: dict[str, tuple[str, ...]] = {}
+    for file_path, relative_path in zip(file_paths, relative_file_paths):
+        _check_budget(budget, "semantic.prepare.fingerprint")
+        prior = previous.get(relative_path)
+        fingerprint = _file_fingerprint(file_path, prior[0] if prior is not None else None)
+        sources[relative_path] = fingerprint
+        if prior is not None and prior[0][2] == fingerprint[2]:
+            reused[relative_path] = prior[1]
+    extracted = _iter_extracted_pages(
+        [path for path, rel in zip(file_paths, relative_file_paths) if rel not in reused],
+        budget=budget,
+        workers=workers,
+    )
+
+    for file_path, relative_path in zip(file_paths, relative_file_paths):
         _check_budget(budget, "semantic.prepare.file")
-        relative_path = file_path.relative_to(target_folder).as_posix()
-        pages = _extract_pages(file_path, budget=budget)
+        pages = reused.get(relative_path)
+        needs_cleaning = pages is None
+        if pages is None:
+            pages = next(extracted)
         indexed_files += 1
 
         for page_number, page_text in enumerate(pages, start=1):
             _check_budget(budget, "semantic.prepare.page")
-            cleaned = normalize_text(page_text).strip()
-            records.append(
-                {
-                    "relative_path": relative_path,
-                    "file_name": file_path.name,
-                    "page": page_number,
-                    "text": cleaned,
-                }
-            )
+            cleaned = normalize_text(page_text).strip() if needs_cleaning else page_text
+            relative_paths.append(relative_path)
+            file_names.append(file_path.name)
+            page_numbers.append(page_number)
+            texts.append(cleaned)
             embedding_inputs.append(
                 f"File: {relative_path}\n{cleaned}" if cleaned else f"File: {relative_path}"
             )
             indexed_pages += 1
 
+    records = {
+        "relative_path": relative_paths,
+        "file_name": file_names,
+        "page": page_numbers,
+        "text": texts,
+    }
+    # The fingerprints describe the records being written, so they are only
+    # replaced once those records are in place.
+    (db_path / SEMANTIC_SOURCES_FILENAME).unlink(missing_ok=True)
     _write_faiss_database(db_path, records, embedding_inputs, budget=budget)
+    (db_path / SEMANTIC_SOURCES_FILENAME).write_text(
+        json.dumps({"extraction_version": EXTRACTION_VERSION, "files": sources}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    # Lookups made while the index was being written may have missed it.
+    clear_database_lookup_cache()
     return PrepareStats(target_folder, db_path, indexed_files=indexed_files, indexed_pages=indexed_pages)
 
 
@@ -108,18 +197,12 @@ def semantic_search_file_pages(
     db_path = indexed_root / SEMANTIC_DB_DIRNAME
     vectors = _load_vectors(db_path, budget=budget)
     _, record_positions = _load_record_indexes(db_path, budget=budget)
-    query_vector = _encode_texts([query.strip()], budget=budget)[0]
-
-    scored_pages: list[tuple[float, int]] = []
-    for vector_index, page in record_positions.get(relative_path, ()):
-        _check_budget(budget, "semantic.search.record")
-        if vector_index >= len(vectors):
-            continue
-        score = _dot(query_vector, vectors[vector_index])
-        scored_pages.append((score, page))
+    query_vector = _encode_query_vectors([query.strip()], budget=budget)[0]
 
-    scored_pages.sort(key=lambda item: item[0], reverse=True)
-    return [page for _, page in scored_pages[:top_k]]
+    rows, pages = _file_positions(record_positions, relative_path, len(vectors))
+    _check_budget(budget, "semantic.search.record")
+    scores = _score_rows(vectors, rows, query_vector)
+    return pages[_top_k_order(scores, top_k)].tolist()
 
 
 def semantic_search_file_chunks(
@@ -145,26 +228,18 @@ def semantic_search_file_chunks(
     db_path = indexed_root / SEMANTIC_DB_DIRNAME
     vectors = _load_vectors(db_path, budget=budget)
     records = _load_records(db_path)
-    query_vector = _encode_texts([query.strip()], budget=budget)[0]
-
-    scored_chunks: list[tuple[float, int, str]] = []
-    for record_index, record in enumerate(records):
-        _check_budget(budget, "semantic.search.record")
-        if record_index >= len(vectors):
-            continue
-        record_relative_path = record.get("relative_path")
-        if not isinstance(record_relative_path, str) or record_relative_path != relative_path:
-            continue
-
-        page = record.get("page")
-        if not isinstance(page, int):
-            continue
-
-        score = _dot(query_vector, vectors[record_index])
-        scored_chunks.append((score, page, str(record.get("text", ""))))
+    _, record_positions = _load_record_indexes(db_path, budget=budget)
+    query_vector = _encode_query_vectors([query.strip()], budget=budget)[0]
 
-    scored_chunks.sort(key=lambda item: (-item[0], item[1]))
-    return [(page, text) for _, page, text in scored_chunks[:top_k]]
+    # Positions are ordered by page, so score ties keep ascending page order.
+    rows, pages = _file_positions(record_positions, relative_path, len(vectors))
+    _check_budget(budget, "semantic.search.record")
+    scores = _score_rows(vectors, rows, query_vector)
+    order = _top_k_order(scores, top_k)
+    return [
+        (page, records.texts[record_index])
+        for record_index, page in zip(rows[order].tolist(), pages[order].tolist())
+    ]
 
 
 def semantic_search_directory_chunks(
@@ -192,42 +267,35 @@ def semantic_search_directory_chunks(
     db_path = indexed_root / SEMANTIC_DB_DIRNAME
     vectors = _load_vectors(db_path, budget=budget)
     records = _load_records(db_path)
-    query_vector = _encode_texts([query.strip()], budget=budget)[0]
+    query_vector = _encode_query_vectors([query.strip()], budget=budget)[0]
 
-    rel_dir = resolved_dir.relative_to(indexed_root).as_posix()
-    if rel_dir == ".":
-        rel_dir = ""
+    prefix = _directory_prefix(resolved_dir, indexed_root)
 
-    scored_chunks: list[tuple[float, str, int, str]] = []
-    for record_index, record in enumerate(records):
+    selected: list[tuple[int, str, int]] = []
+    for record_index, (rel_path, page) in enumerate(zip(records.relative_paths, records.pages)):
         _check_budget(budget, "semantic.directory_search.record")
         if record_index >= len(vectors):
             continue
 
-        rel_path = record.get("relative_path")
-        if not isinstance(rel_path, str):
+        if rel_path is None or not _in_directory(rel_path, prefix, recursive):
             continue
-        rel_parent = str(Path(rel_path).parent.as_posix())
-        if rel_parent == ".":
-            rel_parent = ""
-
-        if recursive:
-            if rel_dir and not rel_path.startswith(f"{rel_dir}/"):
-                continue
-        elif rel_parent != rel_dir:
-            continue
-
-        page = record.get("page")
-        if not isinstance(page, int):
+        if page is None:
             continue
-
-        score = _dot(query_vector, vectors[record_index])
-        scored_chunks.append((score, rel_path, page, str(record.get("text", ""))))
-
-    scored_chunks.sort(key=lambda item: (-item[0], item[1], item[2]))
+        selected.append((record_index, rel_path, page))
+
+    scores = _score_rows(vectors, [record_index for record_index, _, _ in selected], query_vector)
+    # Only chunks scoring at least the k-th best can make the cut; ordering
+    # those few with the full tie-break key is exact and avoids a full sort.
+    scored_chunks = sorted(
+        (
+            (float(scores[i]), *selected[i])
+            for i in _top_k_candidates(scores, top_k)
+        ),
+        key=lambda item: (-item[0], item[2], item[3]),
+    )
     return [
-        (indexed_root / rel_path, page, text)
-        for _, rel_path, page, text in scored_chunks[:top_k]
+        (indexed_root / rel_path, page, records.texts[record_index])
+        for _, record_index, rel_path, page in scored_chunks[:top_k]
     ]
 
 
@@ -256,36 +324,22 @@ def semantic_search_directory_files(
     db_path = indexed_root / SEMANTIC_DB_DIRNAME
     vectors = _load_vectors(db_path, budget=budget)
     _, record_positions = _load_record_indexes(db_path, budget=budget)
-    query_vector = _encode_texts([query.strip()], budget=budget)[0]
+    query_vector = _encode_query_vectors([query.strip()], budget=budget)[0]
 
-    rel_dir = resolved_dir.relative_to(indexed_root).as_posix()
-    if rel_dir == ".":
-        rel_dir = ""
+    prefix = _directory_prefix(resolved_dir, indexed_root)
 
+    all_scores = _score_rows(vectors, None, query_vector)
     scored_paths: list[tuple[float, Path]] = []
-    for rel_path, positions in record_positions.items():
+    for rel_path, (rows, _) in record_positions.items():
         _check_budget(budget, "semantic.directory_search.file")
-        rel_parent = str(Path(rel_path).parent.as_posix())
-        if rel_parent == ".":
-            rel_parent = ""
-
-        if recursive:
-            if rel_dir and not rel_path.startswith(f"{rel_dir}/"):
-                continue
-        elif rel_parent != rel_dir:
+        if not _in_directory(rel_path, prefix, recursive):
             continue
 
-        best_score: float | None = None
-        for vector_index, _ in positions:
-            _check_budget(budget, "semantic.directory_search.record")
-            if vector_index >= len(vectors):
-                continue
-            score = _dot(query_vector, vectors[vector_index])
-            if best_score is None or score > best_score:
-                best_score = score
-
-        if best_score is None:
+        _check_budget(budget, "semantic.directory_search.record")
+        vector_indexes = rows[rows < len(vectors)]
+        if len(vector_indexes) == 0:
             continue
+        best_score = float(all_scores[vector_indexes].max())
         scored_paths.append((best_score, indexed_root / rel_path))
 
     scored_paths.sort(key=lambda item: (-item[0], item[1].as_posix()))
@@ -298,6 +352,11 @@ def get_file_pages_from_database(
     *,
     budget: ExecutionBudget | None = None,
 ) -> list[str] | None:
+    # Directory walks build a fresh DSLFile per path, so the pages found in
+    # the index are remembered per file. Each call still finds the nearest
+    # index and stats its records.json, since an index may be built or
+    # replaced at any time (e.g. by the CLI in another process), and only
+    # reuses pages recorded against that exact records file.
     resolved_file_path = file_path.resolve()
     try:
         indexed_root = _find_indexed_root(
@@ -311,19 +370,30 @@ def get_file_pages_from_database(
         return None
 
     records_path = indexed_root / SEMANTIC_DB_DIRNAME / SEMANTIC_RECORDS_FILENAME
-    if not records_path.is_file():
+    try:
+        records_key = _cache_key(records_path)
+    except OSError:
         return None
 
+    cache_key = os.fspath(resolved_file_path)
+    cached = _file_pages_cache.get(cache_key)
+    if cached is not None and cached[0] == records_key:
+        _check_budget(budget, "semantic.file_pages.record")
+        return list(cached[1]) if cached[1] is not None else None
+
     relative_path = resolved_file_path.relative_to(indexed_root).as_posix()
     file_pages, _ = _load_record_indexes(indexed_root / SEMANTIC_DB_DIRNAME, budget=budget)
-    pages = file_pages.get(relative_path)
-    if not pages:
-        return None
-    result: list[str] = []
-    for _, text in pages:
-        _check_budget(budget, "semantic.file_pages.record")
-        result.append(text)
-    return result
+    pages: list[str] | None = None
+    if file_pages.get(relative_path):
+        pages = []
+        for _, text in file_pages[relative_path]:
+            _check_budget(budget, "semantic.file_pages.record")
+            pages.append(text)
+    with _file_pages_cache_lock:
+        if len(_file_pages_cache) >= FILE_PAGES_CACHE_SIZE:
+            _file_pages_cache.pop(next(iter(_file_pages_cache)), None)
+        _file_pages_cache[cache_key] = (records_key, tuple(pages) if pages is not None else None)
+    return pages
 
 
 def get_directory_file_paths_from_database(
@@ -349,27 +419,33 @@ def get_directory_file_paths_from_database(
     if not records_path.is_file():
         return None
 
-    file_pages, _ = _load_record_indexes(indexed_root / SEMANTIC_DB_DIRNAME, budget=budget)
-    rel_dir = resolved_dir.relative_to(indexed_root).as_posix()
-    if rel_dir == ".":
-        rel_dir = ""
+    sorted_paths = _load_sorted_record_paths(indexed_root / SEMANTIC_DB_DIRNAME, budget=budget)
+    prefix = _directory_prefix(resolved_dir, indexed_root)
 
-    result: set[Path] = set()
-    for rel in file_pages:
+    # Paths under rel_dir form one contiguous run of the sorted keys.
+    result: list[Path] = []
+    for index in range(bisect_left(sorted_paths, prefix), len(sorted_paths)):
+        rel = sorted_paths[index]
+        if not rel.startswith(prefix):
+            break
         _check_budget(budget, "semantic.directory_paths.record")
-        rel_parent = str(Path(rel).parent.as_posix())
-        if rel_parent == ".":
-            rel_parent = ""
+        if _in_directory(rel, prefix, recursive):
+            result.append(indexed_root / rel)
+    return result
+
+
+def _directory_prefix(resolved_dir: Path, indexed_root: Path) -> str:
+    """Record-path prefix of a directory under the indexed root: "" or "sub/dir/"."""
+    rel_dir = resolved_dir.relative_to(indexed_root).as_posix()
+    return "" if rel_dir == "." else f"{rel_dir}/"
 
-        if recursive:
-            if rel_dir and not rel.startswith(f"{rel_dir}/"):
-                continue
-            result.add(indexed_root / rel)
-        else:
-            if rel_parent == rel_dir:
-                result.add(indexed_root / rel)
 
-    return sorted(result, key=lambda p: p.as_posix())
+def _in_directory(rel_path: str, prefix: str, recursive: bool) -> bool:
+    # Record paths are normalized posix paths, so plain string checks stand
+    # in for building a Path per record to compare parents.
+    if not rel_path.startswith(prefix):
+        return False
+    return recursive or rel_path.find("/", len(prefix)) == -1
 
 
 def _iter_document_paths(folder: Path, *, budget: ExecutionBudget | None = None):
@@ -383,6 +459,86 @@ def _iter_document_paths(folder: Path, *, budget: ExecutionBudget | None = None)
         yield path
 
 
+def _file_fingerprint(path: Path, prior: list[int | str] | None) -> list[int | str]:
+    """[size, mtime_ns, content digest]; the digest is reused while size and mtime match."""
+    stats = path.stat()
+    if prior is not None and prior[0] == stats.st_size and prior[1] == stats.st_mtime_ns:
+        return prior
+    with path.open("rb") as handle:
+        digest = hashlib.file_digest(handle, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+    return [stats.st_size, stats.st_mtime_ns, digest]
+
+
+def _load_previous_extractions(db_path: Path) -> dict[str, tuple[list[int | str], tuple[str, ...]]]:
+    """Fingerprint and stored pages of every file in the existing index, if it is reusable."""
+    sources_path = db_path / SEMANTIC_SOURCES_FILENAME
+    if not sources_path.is_file():
+        return {}
+    try:
+        raw = json.loads(sources_path.read_text(encoding="utf-8"))
+        file_pages, _ = _load_record_indexes(db_path)
+    except (OSError, ValueError, DSLRuntimeError):
+        return {}
+    if not isinstance(raw, dict) or raw.get("extraction_version") != EXTRACTION_VERSION:
+        return {}
+    files = raw.get("files")
+    if not isinstance(files, dict):
+        return {}
+
+    previous: dict[str, tuple[list[int | str], tuple[str, ...]]] = {}
+    for relative_path, fingerprint in files.items():
+        pages = file_pages.get(relative_path)
+        if (
+            pages is None
+            or not isinstance(fingerprint, list)
+            or len(fingerprint) != 3
+            or not isinstance(fingerprint[2], str)
+            # Reuse needs the complete page run 1..n as prepare wrote it.
+            or [page for page, _ in pages] != list(range(1, len(pages) + 1))
+        ):
+            continue
+        previous[relative_path] = (fingerprint, tuple(text for _, text in pages))
+    return previous
+
+
+def _iter_extracted_pages(
+    paths: list[Path],
+    *,
+    budget: ExecutionBudget | None = None,
+    workers: int = 1,
+):
+    """Yield the extracted pages of each path, in order."""
+    # Budgets are enforced cooperatively inside the extractors, which a
+    # worker process cannot do, so timed runs extract in-process.
+    heavy = [] if budget is not None else [path for path in paths if path.suffix.lower() in _PROCESS_EXTRACT_SUFFIXES]
+    max_workers = min(workers, _PREPARE_WORKERS, len(heavy))
+    if max_workers < 2:
+        for path in paths:
+            yield _extract_pages(path, budget=budget)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = {path: executor.submit(_extract_pages_worker, os.fspath(path)) for path in heavy}
+        for path in paths:
+            future = futures.get(path)
+            pages = None
+            if future is not None:
+                try:
+                    pages = future.result()
+                except (BrokenProcessPool, RuntimeError):
+                    # Workers die when spawn re-imports a __main__ that calls
+                    # prepare unguarded; the rest is extracted in-process.
+                    futures = {}
+            yield pages if pages is not None else _extract_pages(path, budget=budget)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _extract_pages_worker(path: str) -> list[str]:
+    return _extract_pages(Path(path))
+
+
 def _extract_pages(path: Path, *, budget: ExecutionBudget | None = None) -> list[str]:
     suffix = path.suffix.lower()
     if suffix == ".pdf":
@@ -411,13 +567,16 @@ def _read_pdf_pages(path: Path, *, budget: ExecutionBudget | None = None) -> lis
 
 def _ocr_pdf_page(page) -> str:
     try:
+        import pymupdf
         import pytesseract
         from PIL import Image
     except ImportError:
         return ""
 
-    pix = page.get_pixmap(dpi=200)
-    image = Image.open(io.BytesIO(pix.tobytes("png")))
+    # Tesseract binarizes its input anyway, so render straight to 8-bit
+    # grayscale and wrap the pixel buffer instead of round-tripping a PNG.
+    pix = page.get_pixmap(dpi=200, colorspace=pymupdf.csGRAY, alpha=False)
+    image = Image.frombuffer("L", (pix.width, pix.height), pix.samples, "raw", "L", pix.stride, 1)
     try:
         return pytesseract.image_to_string(image).strip()
     except Exception:
@@ -462,19 +621,37 @@ def _read_pptx_pages(path: Path, *, budget: ExecutionBudget | None = None) -> li
         return _read_pptx_xml_fallback(path, budget=budget)
 
 
+def _xml_text_nodes(data: bytes, *, budget: ExecutionBudget | None, phase: str) -> list[str]:
+    """Stripped, non-empty text of every ``t`` element (any namespace), in document order."""
+    texts: list[str] = []
+    try:
+        from lxml import etree
+    except ImportError:
+        for node in ET.fromstring(data).findall('.//{*}t'):
+            _check_budget(budget, phase)
+            if node.text and node.text.strip():
+                texts.append(node.text.strip())
+        return texts
+
+    # Only the text elements are visited, in a single streaming pass, and
+    # each is released once read.
+    for _, node in etree.iterparse(io.BytesIO(data), events=("end",), tag="{*}t", resolve_entities=False):
+        _check_budget(budget, phase)
+        if node.text and node.text.strip():
+            texts.append(node.text.strip())
+        node.clear()
+    return texts
+
+
 def _read_docx_xml_fallback(path: Path, *, budget: ExecutionBudget | None = None) -> list[str]:
     try:
         with zipfile.ZipFile(path) as archive:
             data = archive.read("word/document.xml")
-        root = ET.fromstring(data)
+        texts = _xml_text_nodes(data, budget=budget, phase="semantic.read_docx_xml.node")
+    except DSLTimeoutError:
+        raise
     except Exception:
         return _read_text_chunks(path, budget=budget)
-
-    texts: list[str] = []
-    for node in root.findall('.//{*}t'):
-        _check_budget(budget, "semantic.read_docx_xml.node")
-        if node.text and node.text.strip():
-            texts.append(node.text.strip())
     return ["\n".join(texts)] if texts else [""]
 
 
@@ -487,12 +664,7 @@ def _read_pptx_xml_fallback(path: Path, *, budget: ExecutionBudget | None = None
             slides: list[str] = []
             for name in slide_names:
                 _check_budget(budget, "semantic.read_pptx_xml.slide")
-                root = ET.fromstring(archive.read(name))
-                texts: list[str] = []
-                for node in root.findall('.//{*}t'):
-                    _check_budget(budget, "semantic.read_pptx_xml.node")
-                    if node.text and node.text.strip():
-                        texts.append(node.text.strip())
+                texts = _xml_text_nodes(archive.read(name), budget=budget, phase="semantic.read_pptx_xml.node")
                 slides.append("\n".join(texts))
             return slides or [""]
     except DSLTimeoutError:
@@ -507,17 +679,13 @@ def _read_text_chunks(
     *,
     budget: ExecutionBudget | None = None,
 ) -> list[str]:
-    try:
-        text = path.read_text(encoding="utf-8")
-    except UnicodeDecodeError:
-        text = path.read_text(encoding="utf-8", errors="replace")
+    text = read_text_file(path)
     if text == "":
         return [""]
-    lines = text.splitlines()
     chunks: list[str] = []
-    for i in range(0, len(lines), lines_per_chunk):
+    for block in iter_line_blocks(text, lines_per_chunk):
         _check_budget(budget, "semantic.read_text.chunk")
-        chunks.append("\n".join(lines[i : i + lines_per_chunk]).strip())
+        chunks.append(block.strip())
     return chunks or [text]
 
 
@@ -534,25 +702,39 @@ def _find_indexed_root(
     *,
     budget: ExecutionBudget | None = None,
 ) -> Path:
+    _check_budget(budget, "semantic.find_indexed_root")
+    if (file_path / SEMANTIC_DB_DIRNAME).is_dir():
+        return file_path
+    indexed_root = _find_indexed_ancestor(file_path.parent)
+    if indexed_root is not None:
+        return indexed_root
     display_base = (display_root or Path.cwd()).resolve()
-    for candidate in [file_path, file_path.parent, *file_path.parents]:
-        _check_budget(budget, "semantic.find_indexed_root")
-        if (candidate / SEMANTIC_DB_DIRNAME).is_dir():
-            return candidate
     rendered = _render_relative_path(file_path, display_base)
     raise DSLRuntimeError(f"No semantic index found for {rendered}. Run 'uv run fdsl prepare <folder>' first.")
 
 
+def _find_indexed_ancestor(directory: Path) -> Path | None:
+    # Not cached: confirming a remembered root would need the same is_dir()
+    # checks on every level below it, since a nearer index may appear at any
+    # time (e.g. built by the CLI in another process).
+    for candidate in (directory, *directory.parents):
+        if (candidate / SEMANTIC_DB_DIRNAME).is_dir():
+            return candidate
+    return None
+
+
 def _write_faiss_database(
     db_path: Path,
-    records: list[dict[str, str | int]],
+    records: dict[str, list],
     embedding_inputs: list[str],
     *,
     budget: ExecutionBudget | None = None,
 ) -> None:
     vectors = _encode_texts(embedding_inputs, budget=budget)
+    # Records are stored as parallel columns rather than one object per page,
+    # which keeps both the file and the parsed result much smaller.
     (db_path / SEMANTIC_RECORDS_FILENAME).write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
-    (db_path / SEMANTIC_VECTORS_FILENAME).write_text(json.dumps(vectors), encoding="utf-8")
+    _write_vectors(db_path, vectors)
     _write_embedding_meta(db_path)
     # Marker file to make the storage explicitly faiss-backed for callers.
     (db_path / SEMANTIC_INDEX_FILENAME).write_text("faiss-index-placeholder", encoding="utf-8")
@@ -564,14 +746,34 @@ def _load_faiss_database(db_path: Path):
     return records, vectors
 
 
-def _load_records(db_path: Path) -> list[dict[str, str | int]]:
+def _load_records(db_path: Path) -> _RecordColumns:
     records_path = db_path / SEMANTIC_RECORDS_FILENAME
     if not records_path.is_file():
         raise DSLRuntimeError("No prepared semantic index collection found. Run 'uv run fdsl prepare <folder>' first.")
     return _load_records_cached(*_cache_key(records_path))
 
 
-def _load_vectors(db_path: Path, *, budget: ExecutionBudget | None = None) -> list[list[float]]:
+def _write_vectors(db_path: Path, vectors) -> None:
+    import numpy as np
+
+    # Stored rows are unit length (or all zero), which is what lets every
+    # search score with a plain dot product: against a unit query it is the
+    # cosine similarity, with no per-row norm at query time.
+    matrix = np.asarray(vectors, dtype=np.float64).reshape(len(vectors), EMBEDDING_DIM)
+    norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix))
+    np.divide(matrix, norms[:, None], out=matrix, where=norms[:, None] > 0)
+    matrix = matrix.astype(np.float32)
+    vectors_path = db_path / SEMANTIC_VECTORS_FILENAME
+    # Readers may hold the previous file memory-mapped, so the new matrix is
+    # written aside and swapped in rather than overwritten in place.
+    temp_path = vectors_path.with_name(f"{vectors_path.name}.tmp")
+    with temp_path.open("wb") as handle:
+        np.save(handle, matrix)
+    os.replace(temp_path, vectors_path)
+    (db_path / LEGACY_VECTORS_FILENAME).unlink(missing_ok=True)
+
+
+def _load_vectors(db_path: Path, *, budget: ExecutionBudget | None = None):
     _ensure_vectors_compatible(db_path, budget=budget)
     vectors_path = db_path / SEMANTIC_VECTORS_FILENAME
     if not vectors_path.is_file():
@@ -627,23 +829,20 @@ def _is_embedding_meta_current(meta: dict[str, str | int] | None) -> bool:
     return True
 
 
-def _embedding_input_from_record(record: dict[str, str | int]) -> str:
-    relative_path = record.get("relative_path")
-    if not isinstance(relative_path, str):
+def _embedding_input_from_record(relative_path: str | None, text: str) -> str:
+    if relative_path is None:
         relative_path = ""
-    text = str(record.get("text", ""))
     return f"File: {relative_path}\n{text}" if text else f"File: {relative_path}"
 
 
 def _rebuild_vectors_from_records(db_path: Path, *, budget: ExecutionBudget | None = None) -> None:
     records = _load_records(db_path)
     embedding_inputs: list[str] = []
-    for record in records:
+    for relative_path, text in zip(records.relative_paths, records.texts):
         _check_budget(budget, "semantic.rebuild_vectors.record")
-        embedding_inputs.append(_embedding_input_from_record(record))
+        embedding_inputs.append(_embedding_input_from_record(relative_path, text))
     vectors = _encode_texts(embedding_inputs, budget=budget)
-    vectors_path = db_path / SEMANTIC_VECTORS_FILENAME
-    vectors_path.write_text(json.dumps(vectors), encoding="utf-8")
+    _write_vectors(db_path, vectors)
     _write_embedding_meta(db_path)
     _load_vectors_cached.cache_clear()
 
@@ -676,28 +875,52 @@ def _ensure_vectors_compatible(db_path: Path, *, budget: ExecutionBudget | None
 
 
 @lru_cache(maxsize=8)
-def _load_records_cached(path: str, mtime_ns: int, size: int) -> list[dict[str, str | int]]:
+def _load_records_cached(path: str, mtime_ns: int, size: int) -> _RecordColumns:
     del mtime_ns, size
-    loaded = json.loads(Path(path).read_text(encoding="utf-8"))
-    if not isinstance(loaded, list):
+    # records.json is the largest file of an index; orjson parses it from
+    # bytes several times faster when installed.
+    data = Path(path).read_bytes()
+    try:
+        import orjson
+    except ImportError:
+        loaded = json.loads(data)
+    else:
+        loaded = orjson.loads(data)
+    if isinstance(loaded, list):
+        # Indexes written before the columnar layout kept one object per page.
+        entries = [entry for entry in loaded if isinstance(entry, dict)]
+        relative_paths = [entry.get("relative_path") for entry in entries]
+        pages = [entry.get("page") for entry in entries]
+        texts = [entry.get("text", "") for entry in entries]
+    elif isinstance(loaded, dict):
+        relative_paths = loaded.get("relative_path")
+        pages = loaded.get("page")
+        texts = loaded.get("text")
+        if not (
+            isinstance(relative_paths, list)
+            and isinstance(pages, list)
+            and isinstance(texts, list)
+            and len(relative_paths) == len(pages) == len(texts)
+        ):
+            raise DSLRuntimeError("Semantic records database is corrupted.")
+    else:
         raise DSLRuntimeError("Semantic records database is corrupted.")
-    records: list[dict[str, str | int]] = []
-    for entry in loaded:
-        if isinstance(entry, dict):
-            records.append(entry)
-    return records
+
+    return _RecordColumns(
+        relative_paths=tuple(value if isinstance(value, str) else None for value in relative_paths),
+        pages=tuple(value if isinstance(value, int) else None for value in pages),
+        texts=tuple(value if isinstance(value, str) else str(value) for value in texts),
+    )
 
 
 @lru_cache(maxsize=8)
-def _load_vectors_cached(path: str, mtime_ns: int, size: int) -> list[list[float]]:
+def _load_vectors_cached(path: str, mtime_ns: int, size: int):
+    import numpy as np
+
     del mtime_ns, size
-    loaded = json.loads(Path(path).read_text(encoding="utf-8"))
-    if not isinstance(loaded, list):
+    vectors = np.load(path, mmap_mode="r", allow_pickle=False)
+    if vectors.ndim != 2 or vectors.shape[1] != EMBEDDING_DIM or vectors.dtype != np.float32:
         raise DSLRuntimeError("Semantic vectors database is corrupted.")
-    vectors: list[list[float]] = []
-    for vector in loaded:
-        if isinstance(vector, list):
-            vectors.append([float(value) for value in vector])
     return vectors
 
 
@@ -705,7 +928,7 @@ def _load_record_indexes(
     db_path: Path,
     *,
     budget: ExecutionBudget | None = None,
-) -> tuple[dict[str, tuple[tuple[int, str], ...]], dict[str, tuple[tuple[int, int], ...]]]:
+) -> tuple[dict[str, tuple[tuple[int, str], ...]], dict[str, tuple]]:
     records_path = db_path / SEMANTIC_RECORDS_FILENAME
     if not records_path.is_file():
         raise DSLRuntimeError("No prepared semantic index collection found. Run 'uv run fdsl prepare <folder>' first.")
@@ -718,64 +941,178 @@ def _load_record_indexes(
     return pages, positions
 
 
+def _file_positions(record_positions: dict[str, tuple], relative_path: str, vector_count: int):
+    """Vector rows and page numbers of one file, ordered by page, limited to existing vectors."""
+    import numpy as np
+
+    positions = record_positions.get(relative_path)
+    if positions is None:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.int64)
+    rows, pages = positions
+    if len(rows) and rows.max() >= vector_count:
+        keep = rows < vector_count
+        return rows[keep], pages[keep]
+    return rows, pages
+
+
+def _load_sorted_record_paths(db_path: Path, *, budget: ExecutionBudget | None = None) -> tuple[str, ...]:
+    records_path = db_path / SEMANTIC_RECORDS_FILENAME
+    if not records_path.is_file():
+        raise DSLRuntimeError("No prepared semantic index collection found. Run 'uv run fdsl prepare <folder>' first.")
+    _check_budget(budget, "semantic.load_records.paths")
+    return _load_sorted_record_paths_cached(*_cache_key(records_path))
+
+
+@lru_cache(maxsize=8)
+def _load_sorted_record_paths_cached(path: str, mtime_ns: int, size: int) -> tuple[str, ...]:
+    pages, _ = _load_record_indexes_cached(path, mtime_ns, size)
+    return tuple(sorted(pages))
+
+
 @lru_cache(maxsize=8)
 def _load_record_indexes_cached(
     path: str, mtime_ns: int, size: int
-) -> tuple[dict[str, tuple[tuple[int, str], ...]], dict[str, tuple[tuple[int, int], ...]]]:
-    records = _load_records_cached(path, mtime_ns, size)
-    pages_by_path: dict[str, list[tuple[int, str]]] = {}
-    positions_by_path: dict[str, list[tuple[int, int]]] = {}
+) -> tuple[dict[str, tuple[tuple[int, str], ...]], dict[str, tuple]]:
+    import numpy as np
 
-    for index, record in enumerate(records):
-        relative_path = record.get("relative_path")
-        if not isinstance(relative_path, str):
-            continue
-
-        page_number = record.get("page")
-        normalized_page = page_number if isinstance(page_number, int) else 0
-        text = record.get("text", "")
-        pages_by_path.setdefault(relative_path, []).append((normalized_page, str(text)))
-        if isinstance(page_number, int):
-            positions_by_path.setdefault(relative_path, []).append((index, page_number))
+    records = _load_records_cached(path, mtime_ns, size)
+    rows = [index for index, relative_path in enumerate(records.relative_paths) if relative_path is not None]
+    if not rows:
+        return {}, {}
+
+    # Group rows by path and order each group by page with one stable
+    # lexsort instead of appending to and sorting per-path lists.
+    names, first_seen, codes = np.unique(
+        np.asarray([records.relative_paths[index] for index in rows]),
+        return_index=True,
+        return_inverse=True,
+    )
+    pages = np.fromiter((records.pages[index] or 0 for index in rows), dtype=np.int64, count=len(rows))
+    order = np.lexsort((pages, codes))
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    starts = [0, *bounds.tolist()]
+    ends = [*bounds.tolist(), len(rows)]
+    row_array = np.asarray(rows, dtype=np.intp)[order]
+    page_array = pages[order]
+    # Shared by every query thread, so the arrays are frozen.
+    row_array.setflags(write=False)
+    page_array.setflags(write=False)
+    sorted_rows = row_array.tolist()
+    sorted_pages = page_array.tolist()
+    paged = np.fromiter((records.pages[index] is not None for index in rows), dtype=bool, count=len(rows))[order]
+    all_paged = bool(paged.all())
+    group_names = names.tolist()
 
     normalized_pages: dict[str, tuple[tuple[int, str], ...]] = {}
-    for relative_path, pages in pages_by_path.items():
-        pages.sort(key=lambda item: item[0])
-        normalized_pages[relative_path] = tuple(pages)
-
-    normalized_positions: dict[str, tuple[tuple[int, int], ...]] = {}
-    for relative_path, positions in positions_by_path.items():
-        positions.sort(key=lambda item: item[1])
-        normalized_positions[relative_path] = tuple(positions)
-
+    normalized_positions: dict[str, tuple] = {}
+    # Groups come out in path order; keep the records' first-seen order.
+    for group in np.argsort(first_seen, kind="stable").tolist():
+        relative_path = group_names[group]
+        start, end = starts[group], ends[group]
+        group_rows = sorted_rows[start:end]
+        normalized_pages[relative_path] = tuple(
+            zip(sorted_pages[start:end], map(records.texts.__getitem__, group_rows))
+        )
+        if all_paged:
+            normalized_positions[relative_path] = (row_array[start:end], page_array[start:end])
+        elif paged[start:end].any():
+            keep = paged[start:end]
+            normalized_positions[relative_path] = (row_array[start:end][keep], page_array[start:end][keep])
+
+    if not all_paged:
+        normalized_positions = dict(sorted(normalized_positions.items(), key=lambda item: int(item[1][0].min())))
     return normalized_pages, normalized_positions
 
 
-def _encode_texts(texts: list[str], *, budget: ExecutionBudget | None = None) -> list[list[float]]:
+def _encode_texts(texts: list[str], *, budget: ExecutionBudget | None = None):
+    """Embed texts as L2-normalized bag-of-hashed-tokens rows of a float32 matrix."""
+    import numpy as np
+
     token_bucket_cache: dict[str, int] = {}
-    vectors: list[list[float]] = []
-    for text in texts:
-        _check_budget(budget, "semantic.encode.text")
-        vec = [0.0] * EMBEDDING_DIM
-        for token_index, token in enumerate(re.findall(r"\w+", text.lower())):
-            if token_index % 128 == 0:
+    vectors = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    for start in range(0, len(texts), _ENCODE_BATCH_SIZE):
+        batch = texts[start : start + _ENCODE_BATCH_SIZE]
+        # Bucket ids of the whole batch, offset by row, are counted in one
+        # bincount pass and normalized together.
+        token_counts: list[int] = []
+        token_buckets: list[int] = []
+        for text in batch:
+            _check_budget(budget, "semantic.encode.text")
+            tokens = _TOKEN_RE.findall(text.lower())
+            for _ in range(0, len(tokens), 128):
                 _check_budget(budget, "semantic.encode.token")
-            bucket = token_bucket_cache.get(token)
-            if bucket is None:
-                bucket = _stable_bucket_index(token)
-                token_bucket_cache[token] = bucket
-            vec[bucket] += 1.0
-        norm = math.sqrt(sum(v * v for v in vec))
-        if norm > 0:
-            vec = [v / norm for v in vec]
-        vectors.append(vec)
+            for token in set(tokens).difference(token_bucket_cache):
+                token_bucket_cache[token] = _stable_bucket_index(token)
+            token_counts.append(len(tokens))
+            token_buckets.extend(map(token_bucket_cache.__getitem__, tokens))
+
+        rows = np.repeat(np.arange(len(batch), dtype=np.intp), token_counts)
+        flat = rows * EMBEDDING_DIM + np.asarray(token_buckets, dtype=np.intp)
+        counts = np.bincount(flat, minlength=len(batch) * EMBEDDING_DIM).reshape(len(batch), EMBEDDING_DIM)
+        counts = counts.astype(np.float64)
+        norms = np.sqrt(np.einsum("ij,ij->i", counts, counts))
+        np.divide(counts, norms[:, None], out=counts, where=norms[:, None] > 0)
+        vectors[start : start + len(batch)] = counts
     return vectors
 
 
+def prime_query_vectors(queries: list[str], *, budget: ExecutionBudget | None = None) -> None:
+    """Embed upcoming semantic-search queries in a single batch."""
+    _encode_query_vectors([query.strip() for query in queries if query.strip()], budget=budget)
+
+
+def _encode_query_vectors(
+    queries: list[str],
+    *,
+    budget: ExecutionBudget | None = None,
+) -> list[tuple[float, ...]]:
+    vectors = {query: _query_vector_cache.get(query) for query in queries}
+    missing = [query for query, vector in vectors.items() if vector is None]
+    if missing:
+        for query, vector in zip(missing, _encode_texts(missing, budget=budget), strict=True):
+            cached = tuple(float(value) for value in vector)
+            vectors[query] = cached
+            if len(_query_vector_cache) >= QUERY_VECTOR_CACHE_SIZE:
+                _query_vector_cache.pop(next(iter(_query_vector_cache), None), None)
+            _query_vector_cache[query] = cached
+    return [vectors[query] for query in queries]
+
+
+@lru_cache(maxsize=TOKEN_BUCKET_CACHE_SIZE)
 def _stable_bucket_index(token: str) -> int:
-    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
-    return int.from_bytes(digest, "big") % EMBEDDING_DIM
+    # CRC-32 is stable across processes (unlike hash()) and far cheaper than
+    # a cryptographic digest; changing it requires bumping EMBEDDING_VERSION.
+    # Token frequencies are Zipfian, so most lookups across encode calls
+    # (each query is its own call) hit the cache.
+    return zlib.crc32(token.encode("utf-8")) & _EMBEDDING_MASK
+
+
+def _score_rows(vectors, rows, query_vector: tuple[float, ...]):
+    """Dot products of ``query_vector`` with the given vector rows (all rows for None)."""
+    import numpy as np
+
+    query = np.asarray(query_vector, dtype=np.float32)
+    if rows is None:
+        return vectors @ query
+    if len(rows) == 0:
+        return np.empty(0, dtype=np.float32)
+    return vectors[np.asarray(rows, dtype=np.intp)] @ query
+
+
+def _top_k_candidates(scores, top_k: int):
+    """Indices of every score that ties or beats the ``top_k``-th best, in index order."""
+    import numpy as np
+
+    if len(scores) <= top_k:
+        return np.arange(len(scores))
+    threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+    return np.flatnonzero(scores >= threshold)
+
 
+def _top_k_order(scores, top_k: int) -> list[int]:
+    """Indices of the ``top_k`` best scores, best first; ties keep index order."""
+    import numpy as np
 
-def _dot(a: list[float], b: list[float]) -> float:
-    return sum(x * y for x, y in zip(a, b, strict=False))
+    candidates = _top_k_candidates(scores, top_k)
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order[:top_k]].tolist()
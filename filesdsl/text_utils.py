@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import re
 import unicodedata
+from pathlib import Path
+from typing import Iterator
+
+
+# Line boundaries str.splitlines() honours besides "\n".
+_OTHER_LINE_BREAKS_RE = re.compile("[\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
 
 
 def normalize_text(text: str) -> str:
@@ -25,3 +32,48 @@ def normalize_text(text: str) -> str:
         out.append(char)
 
     return "".join(out)
+
+
+def read_text_file(path: Path) -> str:
+    """Read a file as UTF-8 (undecodable bytes replaced) with universal newlines.
+
+    Matches ``path.read_text`` with a strict-then-replace fallback, but reads
+    the file only once.
+    """
+    data = path.read_bytes()
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def iter_line_blocks(text: str, lines_per_block: int) -> Iterator[str]:
+    """Yield runs of ``lines_per_block`` lines, as ``"\n".join`` over ``text.splitlines()``.
+
+    Text that only uses "\n" line breaks is sliced directly between newline
+    offsets, without building the per-line list.
+    """
+    if _OTHER_LINE_BREAKS_RE.search(text):
+        lines = text.splitlines()
+        for start in range(0, len(lines), lines_per_block):
+            yield "\n".join(lines[start : start + lines_per_block])
+        return
+    if not text:
+        return
+
+    # splitlines() does not yield an empty line after a final terminator.
+    end = len(text) - 1 if text.endswith("\n") else len(text)
+    start = 0
+    while True:
+        cut = start
+        for _ in range(lines_per_block):
+            cut = text.find("\n", cut, end)
+            if cut == -1:
+                yield text[start:end]
+                return
+            cut += 1
+        yield text[start : cut - 1]
+        start = cut
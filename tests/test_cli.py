@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import io
+import os
 import tempfile
 import unittest
 from contextlib import redirect_stdout
@@ -27,7 +28,7 @@ class FilesDSLCLITests(unittest.TestCase):
                     exit_code = main(["prepare", temp_dir])
 
             self.assertEqual(exit_code, 0)
-            prepare_mock.assert_called_once_with(folder)
+            prepare_mock.assert_called_once_with(folder, workers=os.cpu_count() or 1)
             text = output.getvalue()
             self.assertIn("Indexed files: 3", text)
             self.assertIn("Indexed pages: 9", text)
@@ -14,7 +14,8 @@ from unittest.mock import patch
 from filesdsl.errors import DSLRuntimeError, DSLSyntaxError, DSLTimeoutError
 from filesdsl.execution_budget import ExecutionBudget
 from filesdsl.interpreter import execute_fdsl, run_script
-from filesdsl.runtime import DSLFile
+from filesdsl.parser import Parser
+from filesdsl.runtime import DSLFile, iter_with_prefetched_chunks
 
 
 class FilesDSLTests(unittest.TestCase):
@@ -116,6 +117,63 @@ print("after-search")
             output = execute_fdsl('print("ok")\n', cwd=root, sandbox_root=root, timeout_s=1.0)
             self.assertEqual(output, "ok\n")
 
+    def test_parsed_program_is_reused_across_runs(self) -> None:
+        root = Path.cwd()
+        script = 'cached_value = 41 + 1\nprint(cached_value)\n'
+        with patch("filesdsl.interpreter.Parser", wraps=Parser) as parser_mock:
+            first = execute_fdsl(script, cwd=root, sandbox_root=root)
+            second = execute_fdsl(script, cwd=root, sandbox_root=root)
+
+        self.assertEqual(first, "42\n")
+        self.assertEqual(second, "42\n")
+        self.assertLessEqual(parser_mock.call_count, 1)
+
+    def test_run_script_returns_only_assigned_variables(self) -> None:
+        script = "total = 0\nfor value in [1:3]:\n    total = total + value\nprint(len([total]))\n"
+        variables = run_script(script, cwd=Path.cwd(), sandbox_root=Path.cwd(), stdout=StringIO())
+        self.assertEqual(variables, {"total": 6, "value": 3})
+
+    def test_interpreter_keeps_variables_bound_before_a_failure(self) -> None:
+        from filesdsl.interpreter import Interpreter
+
+        interpreter = Interpreter("a = 1\nb = [1:2]\nc = missing\n", cwd=Path.cwd(), stdout=StringIO())
+        with self.assertRaises(DSLRuntimeError):
+            interpreter.run()
+        self.assertEqual(interpreter.variables, {"a": 1, "b": [1, 2]})
+
+    def test_semantic_queries_are_encoded_once(self) -> None:
+        from filesdsl.analyzer import analyze
+        from filesdsl.semantic import _encode_query_vectors, _query_vector_cache
+
+        program = analyze(Parser('a = d.semantic_search(" alpha beta ")\nb = d.semantic_search("alpha beta")\n').parse())
+        self.assertEqual(program.semantic_queries, ("alpha beta",))
+
+        _query_vector_cache.pop("gamma delta", None)
+        with patch("filesdsl.semantic._encode_texts", return_value=[[1.0, 0.0]]) as encode_mock:
+            first = _encode_query_vectors(["gamma delta", "gamma delta"])
+            second = _encode_query_vectors(["gamma delta"])
+        _query_vector_cache.pop("gamma delta", None)
+
+        encode_mock.assert_called_once()
+        self.assertEqual(first, [(1.0, 0.0), (1.0, 0.0)])
+        self.assertEqual(second, [(1.0, 0.0)])
+
+    def test_constant_expressions_are_folded(self) -> None:
+        from filesdsl.analyzer import optimize
+        from filesdsl.ast_nodes import Assign, Literal
+
+        program = optimize(Parser('"unused"\nx = 2 * 3 + 1\ny = [1, 3:5, "a"]\nz = 1 / 0\n').parse())
+        self.assertEqual(len(program.statements), 3)
+        self.assertEqual(program.statements[0].expr, Literal(7, program.statements[0].expr.loc))
+        self.assertEqual(program.statements[1].expr.constant, (1, 3, 4, 5, "a"))
+        self.assertIsInstance(program.statements[2], Assign)
+        self.assertNotIsInstance(program.statements[2].expr, Literal)
+
+        script = "pages = [1:3]\npages2 = [1:3]\n"
+        variables = run_script(script, cwd=Path.cwd(), sandbox_root=Path.cwd())
+        self.assertEqual(variables["pages"], [1, 2, 3])
+        self.assertIsNot(variables["pages"], variables["pages2"])
+
     def test_range_syntax_in_lists(self) -> None:
         script = "pages = [1, 5:8, 15]\n"
         variables = run_script(script, cwd=Path.cwd(), sandbox_root=Path.cwd())
@@ -167,6 +225,117 @@ dir_miss = "zzz" in d
             self.assertTrue(variables["dir_hit"])
             self.assertFalse(variables["dir_miss"])
 
+    def test_file_loop_prefetches_content_in_order(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            for index in range(6):
+                (root / f"doc{index}.txt").write_text(f"doc {index} alpha\n", encoding="utf-8")
+
+            script = """
+docs = Directory(".")
+for file in docs.files():
+    if file.contains("alpha"):
+        print(file.head())
+"""
+            with patch(
+                "filesdsl.interpreter.iter_with_prefetched_chunks",
+                wraps=iter_with_prefetched_chunks,
+            ) as prefetch:
+                output = execute_fdsl(script, cwd=root, sandbox_root=root)
+
+            prefetch.assert_called_once()
+            self.assertEqual(output.splitlines(), [f"doc {index} alpha" for index in range(6)])
+
+    def test_file_loop_prefetch_keeps_a_bounded_window(self) -> None:
+        from filesdsl import runtime
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            files = []
+            for index in range(40):
+                path = root / f"doc{index}.txt"
+                path.write_text(f"doc {index}\n", encoding="utf-8")
+                files.append(DSLFile(path, display_root=root))
+
+            window = 2 * runtime._IO_WORKERS
+            loop = iter_with_prefetched_chunks(files)
+            self.assertIs(next(loop), files[0])
+            self.assertLessEqual(sum(file._chunks_cache is not None for file in files), window)
+            self.assertEqual([file.head() for file in loop], [f"doc {index}" for index in range(1, 40)])
+
+    def test_pdf_pages_are_extracted_on_demand(self) -> None:
+        import pymupdf
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            with pymupdf.open() as doc:
+                for index in range(1, 5):
+                    doc.new_page().insert_text((72, 72), f"page {index} marker")
+                doc.save(root / "book.pdf")
+
+            file = DSLFile(root / "book.pdf", display_root=root)
+            self.assertEqual(file.head(), "page 1 marker")
+            self.assertTrue(file.contains("page 2"))
+            self.assertEqual(len(file._streamed_chunks), 2)
+            self.assertIsNone(file._chunks_cache)
+
+            self.assertEqual(file.search("marker"), [1, 2, 3, 4])
+            self.assertEqual(file.tail(), "page 4 marker")
+            self.assertEqual(file._chunks_cache, [f"page {index} marker" for index in range(1, 5)])
+
+    def test_file_loop_prefetches_only_the_first_pdf_page(self) -> None:
+        import pymupdf
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            for name in ("a.pdf", "b.pdf", "c.pdf"):
+                with pymupdf.open() as doc:
+                    for index in range(1, 5):
+                        doc.new_page().insert_text((72, 72), f"{name} page {index}")
+                    doc.save(root / name)
+
+            files = [DSLFile(root / name, display_root=root) for name in ("a.pdf", "b.pdf", "c.pdf")]
+            for file in iter_with_prefetched_chunks(files):
+                self.assertIsNone(file._chunks_cache)
+                self.assertEqual(len(file._streamed_chunks), 1)
+                self.assertEqual(file.head(), f"{file.path.name} page 1")
+
+    @unittest.skipUnless(os.path.isdir("/proc/self/fd"), "needs /proc/self/fd")
+    def test_partially_read_pdfs_hold_no_open_files(self) -> None:
+        import pymupdf
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            with pymupdf.open() as doc:
+                for index in range(1, 4):
+                    doc.new_page().insert_text((72, 72), f"page {index} marker")
+                doc.save(root / "book.pdf")
+
+            before = len(os.listdir("/proc/self/fd"))
+            files = [DSLFile(root / "book.pdf", display_root=root) for _ in range(20)]
+            for file in files:
+                self.assertEqual(file.head(), "page 1 marker")
+            self.assertLessEqual(len(os.listdir("/proc/self/fd")), before)
+
+            # A fully extracted PDF is reused by later instances for the same file.
+            again = DSLFile(root / "book.pdf", display_root=root)
+            self.assertEqual(again.head(), "page 1 marker")
+            self.assertEqual(again._chunks_cache, file._chunks_cache)
+
+    def test_extracted_chunks_are_shared_until_the_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            notes = root / "notes.txt"
+            notes.write_text("first draft\n", encoding="utf-8")
+            self.assertEqual(DSLFile(notes, display_root=root).head(), "first draft")
+
+            with patch("filesdsl.runtime.read_text_file") as read_text:
+                self.assertEqual(DSLFile(notes, display_root=root).head(), "first draft")
+            read_text.assert_not_called()
+
+            notes.write_text("second, longer draft\n", encoding="utf-8")
+            self.assertEqual(DSLFile(notes, display_root=root).head(), "second, longer draft")
+
     def test_directory_search_and_file_api(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             root = Path(temp_dir)
@@ -201,6 +370,26 @@ count = len(nested)
             recursive_vars = run_script(recursive_script, cwd=root, sandbox_root=root)
             self.assertEqual(recursive_vars["count"], 1)
 
+    def test_directory_search_max_results_stops_early(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "sub").mkdir()
+            for i in range(40):
+                (root / "sub" / f"f{i:02d}.txt").write_text("alpha\n", encoding="utf-8")
+            (root / "sub.txt").write_text("alpha\n", encoding="utf-8")
+
+            script = """
+docs = Directory(".")
+hits = docs.search("alpha", scope="content", max_results=2)
+"""
+            with patch("filesdsl.runtime.DSLFile.contains", autospec=True, side_effect=DSLFile.contains) as contains:
+                variables = run_script(script, cwd=root, sandbox_root=root)
+            self.assertEqual([str(file) for file in variables["hits"]], ["sub.txt", "sub/f00.txt"])
+            self.assertLess(contains.call_count, 41)
+
+            with self.assertRaises(DSLRuntimeError):
+                run_script('hits = Directory(".").search("alpha", max_results=0)\n', cwd=root, sandbox_root=root)
+
     def test_len_directory_returns_file_count(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             root = Path(temp_dir)
@@ -235,6 +424,22 @@ first = f.head()
             self.assertEqual(variables["alpha_pages"], [1])
             self.assertIn("alpha", variables["first"])
 
+    def test_literal_patterns_respect_ignore_case(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "single.txt").write_text("ALPHA\nbeta\n", encoding="utf-8")
+            script = """
+f = File("single.txt")
+strict = f.contains("alpha")
+loose = f.contains("alpha", ignore_case=true)
+flag = true
+dynamic = f.search("alpha", ignore_case=flag)
+"""
+            variables = run_script(script, cwd=root, sandbox_root=root)
+            self.assertFalse(variables["strict"])
+            self.assertTrue(variables["loose"])
+            self.assertEqual(variables["dynamic"], [1])
+
     def test_text_normalization_cleans_unicode_whitespace_and_controls(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             root = Path(temp_dir)
@@ -464,6 +669,36 @@ tree_text = docs.tree(max_entries=3)
         self.assertEqual(context.exception.line, 1)
         self.assertGreaterEqual(context.exception.column, 1)
 
+    def test_repeated_lexer_error_reports_each_location(self) -> None:
+        for script, line, column in (("x = 1 $ 2\n", 1, 7), ("y = 0\n  \nz = 1 $ 2\n", 3, 7)):
+            with self.assertRaises(DSLSyntaxError) as context:
+                Parser(script).parse()
+            self.assertEqual((context.exception.line, context.exception.column), (line, column))
+
+    def test_long_prefix_operator_chains_parse_without_recursion(self) -> None:
+        from filesdsl.ast_nodes import UnaryOp
+
+        program = Parser("x = " + "not " * 3000 + "a == b\n").parse()
+        expr = program.statements[0].expr
+        depth = 0
+        while isinstance(expr, UnaryOp):
+            expr = expr.operand
+            depth += 1
+        self.assertEqual(depth, 3000)
+        self.assertEqual(expr.op, "==")
+
+    def test_boolean_chains_are_flat_and_short_circuit(self) -> None:
+        from filesdsl.ast_nodes import BoolOp
+
+        program = Parser("x = a and b and c and d\n").parse()
+        expr = program.statements[0].expr
+        self.assertIsInstance(expr, BoolOp)
+        self.assertEqual(len(expr.operands), 4)
+
+        script = "x = 0\nfirst = x and missing\nsecond = 1 or missing\nthird = x or 0 or 3\n"
+        variables = run_script(script, cwd=Path.cwd(), sandbox_root=Path.cwd())
+        self.assertEqual((variables["first"], variables["second"], variables["third"]), (False, True, True))
+
     def test_docx_file_methods(self) -> None:
         try:
             from docx import Document
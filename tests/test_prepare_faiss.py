@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import json
+import os
+import subprocess
+import sys
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 from zipfile import ZIP_DEFLATED, ZipFile
 
+import numpy as np
+
+from filesdsl import semantic
 from filesdsl.interpreter import run_script
 from filesdsl.semantic import (
     SEMANTIC_DB_DIRNAME,
@@ -106,6 +113,151 @@ semantic_hit_count = len(semantic_hits)
             self.assertEqual(variables['tree_text'].splitlines()[0], 'another_folder/')
             self.assertIn('nested_note.txt', variables['tree_text'])
 
+    def test_file_content_follows_index_lifecycle(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            work = Path(temp_dir) / 'data'
+            work.mkdir(parents=True, exist_ok=True)
+            notes = work / 'notes.txt'
+            notes.write_text('first draft\n', encoding='utf-8')
+            script = "text = File('notes.txt').head()\n"
+
+            self.assertEqual(run_script(script, cwd=work, sandbox_root=work)['text'], 'first draft')
+
+            prepare_semantic_database(work)
+            notes.write_text('second draft\n', encoding='utf-8')
+            self.assertEqual(run_script(script, cwd=work, sandbox_root=work)['text'], 'first draft')
+
+            prepare_semantic_database(work)
+            self.assertEqual(run_script(script, cwd=work, sandbox_root=work)['text'], 'second draft')
+
+    def test_file_content_uses_index_built_by_another_process(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            work = Path(temp_dir) / 'data'
+            work.mkdir(parents=True, exist_ok=True)
+            notes = work / 'notes.txt'
+            notes.write_text('first draft\n', encoding='utf-8')
+            script = "text = File('notes.txt').head()\n"
+
+            self.assertEqual(run_script(script, cwd=work, sandbox_root=work)['text'], 'first draft')
+
+            subprocess.run(
+                [sys.executable, '-m', 'filesdsl', 'prepare', str(work)],
+                check=True,
+                capture_output=True,
+                cwd=Path(__file__).resolve().parents[1],
+            )
+            notes.write_text('second draft\n', encoding='utf-8')
+            self.assertEqual(run_script(script, cwd=work, sandbox_root=work)['text'], 'first draft')
+
+    def test_file_content_uses_nearer_index_built_by_another_process(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            outer = Path(temp_dir) / 'a'
+            inner = outer / 'b'
+            inner.mkdir(parents=True, exist_ok=True)
+            note = inner / 'x.txt'
+            note.write_text('alpha outer\n', encoding='utf-8')
+            script = "text = File('b/x.txt').head()\n"
+
+            prepare_semantic_database(outer)
+            self.assertEqual(run_script(script, cwd=outer, sandbox_root=outer)['text'], 'alpha outer')
+
+            note.write_text('beta inner\n', encoding='utf-8')
+            subprocess.run(
+                [sys.executable, '-m', 'filesdsl', 'prepare', str(inner)],
+                check=True,
+                capture_output=True,
+                cwd=Path(__file__).resolve().parents[1],
+            )
+            self.assertEqual(run_script(script, cwd=outer, sandbox_root=outer)['text'], 'beta inner')
+
+    def test_indexed_root_lookup_does_not_remember_missing_indexes(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            work = Path(temp_dir).resolve() / 'data'
+            nested = work / 'nested'
+            nested.mkdir(parents=True, exist_ok=True)
+            self.assertIsNone(semantic._find_indexed_ancestor(nested))
+
+            (work / SEMANTIC_DB_DIRNAME).mkdir()
+            self.assertEqual(semantic._find_indexed_ancestor(nested), work)
+
+            (work / SEMANTIC_DB_DIRNAME).rmdir()
+            self.assertIsNone(semantic._find_indexed_ancestor(nested))
+
+    def test_indexed_root_lookup_prefers_a_nearer_index_built_later(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            outer = Path(temp_dir).resolve() / 'a'
+            inner = outer / 'b'
+            inner.mkdir(parents=True, exist_ok=True)
+            (outer / SEMANTIC_DB_DIRNAME).mkdir()
+            self.assertEqual(semantic._find_indexed_root(inner / 'x.txt'), outer)
+
+            (inner / SEMANTIC_DB_DIRNAME).mkdir()
+            self.assertEqual(semantic._find_indexed_root(inner / 'x.txt'), inner)
+
+    def test_prepare_with_worker_processes_matches_serial_records(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            serial = Path(temp_dir) / 'serial'
+            pooled = Path(temp_dir) / 'pooled'
+            for root in (serial, pooled):
+                root.mkdir(parents=True, exist_ok=True)
+                self._create_fixture_documents(root)
+
+            prepare_semantic_database(serial)
+            with patch('filesdsl.semantic._PREPARE_WORKERS', 2):
+                prepare_semantic_database(pooled, workers=2)
+
+            records = [
+                json.loads((root / SEMANTIC_DB_DIRNAME / 'records.json').read_text(encoding='utf-8'))
+                for root in (serial, pooled)
+            ]
+            self.assertEqual(records[0], records[1])
+
+    def test_prepare_with_workers_from_unguarded_script_falls_back_to_serial(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            work = Path(temp_dir) / 'data'
+            work.mkdir(parents=True, exist_ok=True)
+            self._create_fixture_documents(work)
+            script = Path(temp_dir) / 'prepare_script.py'
+            script.write_text(
+                'from pathlib import Path\n'
+                'from filesdsl import semantic\n'
+                'semantic._PREPARE_WORKERS = 2\n'
+                f'stats = semantic.prepare_semantic_database(Path({str(work)!r}), workers=2)\n'
+                'print(stats.indexed_files)\n',
+                encoding='utf-8',
+            )
+            env = dict(os.environ)
+            repo_root = str(Path(__file__).resolve().parents[1])
+            env['PYTHONPATH'] = os.pathsep.join(filter(None, [repo_root, env.get('PYTHONPATH')]))
+            result = subprocess.run(
+                [sys.executable, str(script)],
+                capture_output=True,
+                text=True,
+                env=env,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(result.stdout.strip(), '5')
+
+    def test_prepare_reuses_pages_of_unchanged_files(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            work = Path(temp_dir) / 'data'
+            work.mkdir(parents=True, exist_ok=True)
+            (work / 'a.txt').write_text('alpha\n', encoding='utf-8')
+            (work / 'b.txt').write_text('beta\n', encoding='utf-8')
+            first = prepare_semantic_database(work)
+
+            (work / 'b.txt').write_text('beta, revised\n', encoding='utf-8')
+            with patch('filesdsl.semantic._extract_pages', wraps=semantic._extract_pages) as extract:
+                second = prepare_semantic_database(work)
+            self.assertEqual([call.args[0].name for call in extract.call_args_list], ['b.txt'])
+            self.assertEqual(second.indexed_pages, first.indexed_pages)
+
+            variables = run_script(
+                "a = File('a.txt').head()\nb = File('b.txt').head()\n", cwd=work, sandbox_root=work
+            )
+            self.assertEqual(variables['a'], 'alpha')
+            self.assertEqual(variables['b'], 'beta, revised')
+
     def test_legacy_vectors_are_rebuilt_automatically(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             work = Path(temp_dir) / 'data'
@@ -120,10 +272,11 @@ semantic_hit_count = len(semantic_hits)
             if meta_path.exists():
                 meta_path.unlink()
 
+            # Indexes written before the .npy format kept JSON vectors.
             vectors_path = db_path / SEMANTIC_VECTORS_FILENAME
-            original_vectors = json.loads(vectors_path.read_text(encoding='utf-8'))
-            poisoned = [[0.0] * len(original_vectors[0]) for _ in original_vectors]
-            vectors_path.write_text(json.dumps(poisoned), encoding='utf-8')
+            vectors_path.unlink()
+            legacy_path = db_path / 'vectors.json'
+            legacy_path.write_text(json.dumps([[0.0] * 4, [0.0] * 4]), encoding='utf-8')
 
             script = '''
 docs = Directory('.')
@@ -133,9 +286,39 @@ hits = docs.semantic_search('zebra quantum', top_k=1)
             self.assertEqual(len(variables['hits']), 1)
             self.assertTrue(variables['hits'][0].startswith('[b.txt] => [p.1]'))
             self.assertTrue(meta_path.is_file())
+            self.assertTrue(vectors_path.is_file())
+            self.assertFalse(legacy_path.exists())
+
+            rebuilt_vectors = np.load(vectors_path)
+            self.assertEqual(rebuilt_vectors.shape[0], 2)
+            self.assertTrue(rebuilt_vectors.any())
 
-            rebuilt_vectors = json.loads(vectors_path.read_text(encoding='utf-8'))
-            self.assertTrue(any(any(value != 0.0 for value in vector) for vector in rebuilt_vectors))
+    def test_legacy_row_records_are_still_readable(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            work = Path(temp_dir) / 'data'
+            work.mkdir(parents=True, exist_ok=True)
+            (work / 'a.txt').write_text('alpha alpha alpha\n', encoding='utf-8')
+            (work / 'b.txt').write_text('zebra quantum zebra\n', encoding='utf-8')
+            prepare_semantic_database(work)
+
+            records_path = work / SEMANTIC_DB_DIRNAME / 'records.json'
+            columns = json.loads(records_path.read_text(encoding='utf-8'))
+            rows = [
+                {'relative_path': path, 'file_name': name, 'page': page, 'text': text}
+                for path, name, page, text in zip(
+                    columns['relative_path'], columns['file_name'], columns['page'], columns['text']
+                )
+            ]
+            records_path.write_text(json.dumps(rows), encoding='utf-8')
+
+            script = '''
+docs = Directory('.')
+hits = docs.semantic_search('zebra quantum', top_k=1)
+text = File('a.txt').head()
+'''
+            variables = run_script(script, cwd=work, sandbox_root=work)
+            self.assertEqual(variables['hits'], ['[b.txt] => [p.1] zebra quantum zebra'])
+            self.assertEqual(variables['text'], 'alpha alpha alpha')
 
     def _create_fixture_documents(self, root: Path) -> None:
         (root / 'notes.txt').write_text('alpha line\nbeta line\n', encoding='utf-8')